@@ -19,6 +19,7 @@ from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import base64
 import io
+import threading
 import numpy as np
 
 sys.path.append(str(Path(__file__).parent))
@@ -75,14 +76,23 @@ app.config["MAX_CONTENT_LENGTH"] = API_CONFIG["max_content_length"]
 predictor = None
 predictor_error = None
 _predictor_initialized = False  # guard flag
+_predictor_lock = threading.Lock()  # requests wait while the first one loads
 
 
 def _ensure_predictor():
     """Initialize the predictor on first use (lazy loading)."""
-    global predictor, predictor_error, _predictor_initialized
+    global _predictor_initialized
     if _predictor_initialized:
         return
-    _predictor_initialized = True
+    with _predictor_lock:
+        if not _predictor_initialized:
+            _load_predictor()
+            _predictor_initialized = True
+
+
+def _load_predictor():
+    """Construct the predictor and load all of its models."""
+    global predictor, predictor_error
 
     if TalisayPredictor is None:
         predictor_error = f"Failed to import TalisayPredictor: {PREDICTOR_IMPORT_ERROR}"
@@ -93,7 +103,7 @@ def _ensure_predictor():
         print("=" * 60)
         print("Initializing TalisayPredictor (lazy)...")
         print("=" * 60)
-        predictor = TalisayPredictor(
+        loaded = TalisayPredictor(
             use_simple_color=True,           # HSV-based (always available, fast)
             use_deep_learning_color=True,    # Deep learning (mobile-optimized if available)
             enable_segmentation=True,        # Advanced background removal
@@ -101,6 +111,10 @@ def _ensure_predictor():
             use_yolo=True,                   # YOLOv8 object detection (coin + fruit)
             use_cnn=True                     # Enhanced CNN color classification
         )
+        # Components load lazily; load them all here so model failures
+        # surface now (limited mode) instead of inside a request
+        loaded._initialize_components()
+        predictor = loaded
         print("=" * 60)
         print("✓ TalisayPredictor initialized successfully")
         print("=" * 60)
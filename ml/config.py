@@ -98,6 +98,40 @@ COLOR_MODEL_CONFIG = {
     "learning_rate": 0.001,
 }
 
+# Output index -> label of the trained colour models (alphabetical, as
+# Keras' flow_from_directory orders class folders). Training also writes
+# this to class_indices*.json, which takes precedence when present.
+CLASS_INDICES = {"0": "brown", "1": "green", "2": "yellow"}
+
+# Inference threading for the colour classifiers. The models are small, so
+# TensorFlow's default inter-op pool only oversubscribes the CPU; one
+# inter-op thread plus intra-op/TFLite threads per core keeps latency
+# steady. Override per deployment with TALISAY_TF_INTER_OP_THREADS,
+# TALISAY_TF_INTRA_OP_THREADS and TALISAY_TFLITE_THREADS.
+INFERENCE_THREADS = {
+    "tf_inter_op": int(os.environ.get("TALISAY_TF_INTER_OP_THREADS", 1)),
+    "tf_intra_op": int(os.environ.get("TALISAY_TF_INTRA_OP_THREADS", os.cpu_count() or 1)),
+    "tflite": int(os.environ.get("TALISAY_TFLITE_THREADS", os.cpu_count() or 1)),
+}
+
+
+def configure_tf_threading(tf):
+    """
+    Apply INFERENCE_THREADS to TensorFlow's thread pools.
+    
+    TensorFlow only accepts this before its runtime starts, so it is a
+    no-op (and harmless) once another model has already run.
+    """
+    try:
+        tf.config.threading.set_inter_op_parallelism_threads(
+            INFERENCE_THREADS["tf_inter_op"]
+        )
+        tf.config.threading.set_intra_op_parallelism_threads(
+            INFERENCE_THREADS["tf_intra_op"]
+        )
+    except RuntimeError:
+        pass
+
 # Fruit detection model
 DETECTION_MODEL_CONFIG = {
     "architecture": "EfficientNetB0",
@@ -96,6 +96,22 @@ class AdvancedSegmenter:
             "silver_metallic": {"lower": (0, 0, 100), "upper": (180, 60, 180)},  # Exclude coin
         }
         
+        # Segmentation method -> handler(img, bg_type, result) returning
+        # (mask, confidence). Built once so segment() is a single lookup;
+        # methods missing here (DEEP_LEARNING) fall back to the ensemble.
+        self._dispatch = {
+            SegmentationMethod.ENSEMBLE: self._auto_segmentation,
+            SegmentationMethod.SHAPE_BASED: self._shape_segmentation,
+            SegmentationMethod.COLOR_BASED:
+                lambda img, bg_type, result: self._color_based_segmentation(img, bg_type),
+            SegmentationMethod.EDGE_BASED:
+                lambda img, bg_type, result: self._edge_based_segmentation(img),
+            SegmentationMethod.GRABCUT:
+                lambda img, bg_type, result: self._grabcut_segmentation(img),
+            SegmentationMethod.WATERSHED:
+                lambda img, bg_type, result: self._watershed_segmentation(img),
+        }
+        
         if use_deep_learning:
             self._load_dl_model()
     
@@ -173,75 +189,19 @@ class AdvancedSegmenter:
             result["coin_detected"] = False
         
         # Select best method based on background
-        if method == SegmentationMethod.ENSEMBLE:
-            # PRIORITY 1: Check for green-on-green scene (most challenging)
-            if is_green_on_green and GREEN_ON_GREEN_AVAILABLE:
-                gg_mask, gg_conf, gg_debug = segment_green_on_green(img)
-                if gg_mask is not None and gg_conf > 0.4:
-                    mask = gg_mask
-                    confidence = gg_conf
-                    result["segmentation_method_used"] = "green_on_green (auto-selected)"
-                    result["green_on_green_debug"] = gg_debug
-                else:
-                    # Green-on-green failed, try shape-based
-                    if self.shape_segmenter and bg_type in [BackgroundType.NATURAL, BackgroundType.COMPLEX]:
-                        shape_result = self.shape_segmenter.segment_fruit_by_shape(img, return_debug=False)
-                        if shape_result.get("success") and shape_result.get("confidence", 0) > 0.5:
-                            mask = shape_result["mask"]
-                            confidence = shape_result["confidence"]
-                            result["segmentation_method_used"] = "shape_based (green-on-green failed)"
-                        else:
-                            # Both failed, use ensemble
-                            mask, confidence = self._ensemble_segmentation(img, bg_type)
-                            result["segmentation_method_used"] = "ensemble (both specialized methods failed)"
-                    else:
-                        mask, confidence = self._ensemble_segmentation(img, bg_type)
-                        result["segmentation_method_used"] = "ensemble (shape_based unavailable)"
-            # PRIORITY 2: Try shape-based for natural/complex backgrounds
-            elif self.shape_segmenter and bg_type in [BackgroundType.NATURAL, BackgroundType.COMPLEX]:
-                shape_result = self.shape_segmenter.segment_fruit_by_shape(img, return_debug=False)
-                if shape_result.get("success") and shape_result.get("confidence", 0) > 0.5:
-                    mask = shape_result["mask"]
-                    confidence = shape_result["confidence"]
-                    result["segmentation_method_used"] = "shape_based (auto-selected)"
-                else:
-                    # Fallback to ensemble
-                    mask, confidence = self._ensemble_segmentation(img, bg_type)
-                    result["segmentation_method_used"] = "ensemble (shape_based failed)"
-            else:
-                mask, confidence = self._ensemble_segmentation(img, bg_type)
-                result["segmentation_method_used"] = "ensemble"
-        elif method == SegmentationMethod.SHAPE_BASED:
-            if self.shape_segmenter:
-                shape_result = self.shape_segmenter.segment_fruit_by_shape(img, return_debug=False)
-                mask = shape_result.get("mask")
-                confidence = shape_result.get("confidence", 0)
-                result["shape_analysis"] = {
-                    "shape_score": shape_result.get("shape_score", 0),
-                    "texture_score": shape_result.get("texture_score", 0),
-                    "shadow_detected": shape_result.get("shadow_mask") is not None
-                }
-            else:
-                # Fallback to color-based
-                mask, confidence = self._color_based_segmentation(img, bg_type)
-        elif method == SegmentationMethod.COLOR_BASED:
-            mask, confidence = self._color_based_segmentation(img, bg_type)
-        elif method == SegmentationMethod.EDGE_BASED:
-            mask, confidence = self._edge_based_segmentation(img)
-        elif method == SegmentationMethod.GRABCUT:
-            mask, confidence = self._grabcut_segmentation(img)
-        elif method == SegmentationMethod.WATERSHED:
-            mask, confidence = self._watershed_segmentation(img)
-        else:
-            mask, confidence = self._ensemble_segmentation(img, bg_type)
+        mask, confidence = self._dispatch.get(method, self._ensemble_fallback)(
+            img, bg_type, result
+        )
         
         if mask is not None:
             # Post-process mask
             mask = self._postprocess_mask(mask)
             
-            # Exclude coin region from fruit mask (coin is NOT fruit)
+            # Exclude coin region from fruit mask (coin is NOT fruit).
+            # The mask is our own post-processed copy, so the coin disc is
+            # cleared in place rather than through two full-size temporaries
             if coin_mask is not None and self.exclude_coin:
-                mask = cv2.bitwise_and(mask, cv2.bitwise_not(coin_mask))
+                self._draw_coin(mask, coin_info, 0)
             
             # Find contour
             contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -262,14 +222,93 @@ class AdvancedSegmenter:
                 result["bbox"] = (x, y, w, h)
                 result["confidence"] = confidence
                 result["cropped_fruit"] = cropped
-                result["fruit_area_pixels"] = cv2.contourArea(largest_contour)
-                result["fruit_area_ratio"] = cv2.contourArea(largest_contour) / (img.shape[0] * img.shape[1])
+                fruit_area = cv2.contourArea(largest_contour)
+                result["fruit_area_pixels"] = fruit_area
+                result["fruit_area_ratio"] = fruit_area / (img.shape[0] * img.shape[1])
         
         if return_debug:
             result["debug"] = self._create_debug_visualization(img, result)
         
         return result
     
+    def _auto_segmentation(
+        self,
+        img: np.ndarray,
+        bg_type: BackgroundType,
+        result: Dict
+    ) -> Tuple[Optional[np.ndarray], float]:
+        """ENSEMBLE: pick the specialised method that suits the scene."""
+        # PRIORITY 1: Check for green-on-green scene (most challenging)
+        if result["is_green_on_green_scene"] and GREEN_ON_GREEN_AVAILABLE:
+            gg_mask, gg_conf, gg_debug = segment_green_on_green(img)
+            if gg_mask is not None and gg_conf > 0.4:
+                mask = gg_mask
+                confidence = gg_conf
+                result["segmentation_method_used"] = "green_on_green (auto-selected)"
+                result["green_on_green_debug"] = gg_debug
+            else:
+                # Green-on-green failed, try shape-based
+                if self.shape_segmenter and bg_type in [BackgroundType.NATURAL, BackgroundType.COMPLEX]:
+                    shape_result = self.shape_segmenter.segment_fruit_by_shape(img, return_debug=False)
+                    if shape_result.get("success") and shape_result.get("confidence", 0) > 0.5:
+                        mask = shape_result["mask"]
+                        confidence = shape_result["confidence"]
+                        result["segmentation_method_used"] = "shape_based (green-on-green failed)"
+                    else:
+                        # Both failed, use ensemble
+                        mask, confidence = self._ensemble_segmentation(img, bg_type)
+                        result["segmentation_method_used"] = "ensemble (both specialized methods failed)"
+                else:
+                    mask, confidence = self._ensemble_segmentation(img, bg_type)
+                    result["segmentation_method_used"] = "ensemble (shape_based unavailable)"
+        # PRIORITY 2: Try shape-based for natural/complex backgrounds
+        elif self.shape_segmenter and bg_type in [BackgroundType.NATURAL, BackgroundType.COMPLEX]:
+            shape_result = self.shape_segmenter.segment_fruit_by_shape(img, return_debug=False)
+            if shape_result.get("success") and shape_result.get("confidence", 0) > 0.5:
+                mask = shape_result["mask"]
+                confidence = shape_result["confidence"]
+                result["segmentation_method_used"] = "shape_based (auto-selected)"
+            else:
+                # Fallback to ensemble
+                mask, confidence = self._ensemble_segmentation(img, bg_type)
+                result["segmentation_method_used"] = "ensemble (shape_based failed)"
+        else:
+            mask, confidence = self._ensemble_segmentation(img, bg_type)
+            result["segmentation_method_used"] = "ensemble"
+        
+        return mask, confidence
+    
+    def _shape_segmentation(
+        self,
+        img: np.ndarray,
+        bg_type: BackgroundType,
+        result: Dict
+    ) -> Tuple[Optional[np.ndarray], float]:
+        """SHAPE_BASED: elliptical-shape segmentation, colour-based fallback."""
+        if self.shape_segmenter:
+            shape_result = self.shape_segmenter.segment_fruit_by_shape(img, return_debug=False)
+            mask = shape_result.get("mask")
+            confidence = shape_result.get("confidence", 0)
+            result["shape_analysis"] = {
+                "shape_score": shape_result.get("shape_score", 0),
+                "texture_score": shape_result.get("texture_score", 0),
+                "shadow_detected": shape_result.get("shadow_mask") is not None
+            }
+        else:
+            # Fallback to color-based
+            mask, confidence = self._color_based_segmentation(img, bg_type)
+        
+        return mask, confidence
+    
+    def _ensemble_fallback(
+        self,
+        img: np.ndarray,
+        bg_type: BackgroundType,
+        result: Dict
+    ) -> Tuple[Optional[np.ndarray], float]:
+        """Methods without a handler of their own use the plain ensemble."""
+        return self._ensemble_segmentation(img, bg_type)
+    
     def _load_image(self, image) -> Optional[np.ndarray]:
         """Load image from various sources."""
         if isinstance(image, (str, Path)):
@@ -302,16 +341,18 @@ class AdvancedSegmenter:
         """
         h, w = img.shape[:2]
         mask = np.zeros((h, w), dtype=np.uint8)
-        
+        self._draw_coin(mask, coin_info, 255)
+        return mask
+    
+    def _draw_coin(self, mask: np.ndarray, coin_info: Dict, value: int):
+        """Fill the (slightly expanded) coin disc of `mask` with `value`."""
         center = coin_info.get("coin_center")
         radius = coin_info.get("coin_radius")
         
         if center and radius:
             # Expand slightly to fully cover coin edge
             expanded_radius = int(radius * 1.05)
-            cv2.circle(mask, center, expanded_radius, 255, -1)
-        
-        return mask
+            cv2.circle(mask, center, expanded_radius, value, -1)
     
     def _detect_background_type(self, img: np.ndarray) -> Tuple[BackgroundType, float]:
         """
@@ -413,38 +454,37 @@ class AdvancedSegmenter:
         # Create fruit color mask
         fruit_mask = np.zeros((h, w), dtype=np.uint8)
         
+        # Masks are combined in place; subtracting a 0/255 mask clears the
+        # same pixels as and-ing with its inverse, without the temporary
         for color_name, ranges in self.fruit_color_ranges.items():
             mask = cv2.inRange(hsv, ranges["lower"], ranges["upper"])
-            fruit_mask = cv2.bitwise_or(fruit_mask, mask)
+            cv2.bitwise_or(fruit_mask, mask, dst=fruit_mask)
         
         # Handle different background types
         if bg_type == BackgroundType.WHITE:
-            # Exclude white pixels more aggressively
-            white_mask = cv2.inRange(hsv, (0, 0, 220), (180, 25, 255))
-            fruit_mask = cv2.bitwise_and(fruit_mask, cv2.bitwise_not(white_mask))
-            
-            # Also check for light gray/cream colors that might be sandy
+            # Exclude white pixels (V >= 220, S <= 25) and light gray/cream
+            # colors that might be sandy (V >= 180, S <= 40). The second
+            # range contains the first, so one pass removes both.
             light_mask = cv2.inRange(hsv, (0, 0, 180), (180, 40, 255))
-            fruit_mask = cv2.bitwise_and(fruit_mask, cv2.bitwise_not(light_mask))
+            cv2.subtract(fruit_mask, light_mask, dst=fruit_mask)
             
         elif bg_type == BackgroundType.BLACK:
             # Exclude dark pixels
             black_mask = cv2.inRange(hsv, (0, 0, 0), (180, 255, 40))
-            fruit_mask = cv2.bitwise_and(fruit_mask, cv2.bitwise_not(black_mask))
+            cv2.subtract(fruit_mask, black_mask, dst=fruit_mask)
             
         elif bg_type == BackgroundType.NATURAL:
             # For natural backgrounds, use saturation to distinguish fruit
-            # Fruits tend to have more saturation than background leaves
-            sat_mask = hsv[:, :, 1] > 50
-            fruit_mask = cv2.bitwise_and(fruit_mask, sat_mask.astype(np.uint8) * 255)
-            
-            # Exclude very dark (shadows) and very bright (sky)
-            val_mask = (hsv[:, :, 2] > 40) & (hsv[:, :, 2] < 240)
-            fruit_mask = cv2.bitwise_and(fruit_mask, val_mask.astype(np.uint8) * 255)
+            # (fruits tend to have more saturation than background leaves)
+            # and exclude very dark (shadows) and very bright (sky) pixels:
+            # S > 50 and 40 < V < 240
+            keep_mask = cv2.inRange(hsv, (0, 51, 41), (180, 255, 239))
+            cv2.bitwise_and(fruit_mask, keep_mask, dst=fruit_mask)
         
         # Calculate confidence based on mask quality
-        if np.sum(fruit_mask) > 0:
-            fruit_ratio = np.sum(fruit_mask > 0) / (h * w)
+        fruit_pixels = cv2.countNonZero(fruit_mask)
+        if fruit_pixels > 0:
+            fruit_ratio = fruit_pixels / (h * w)
             # Good fruit should be 5-50% of image
             if 0.05 < fruit_ratio < 0.5:
                 confidence = 0.7
@@ -533,7 +573,7 @@ class AdvancedSegmenter:
             refined_mask = cv2.bitwise_and(binary_mask, fruit_hint)
             
             # If refined mask is too small, use original GrabCut result
-            if np.sum(refined_mask) < np.sum(binary_mask) * 0.3:
+            if cv2.countNonZero(refined_mask) < cv2.countNonZero(binary_mask) * 0.3:
                 refined_mask = binary_mask
             
             return refined_mask, 0.75
@@ -18,15 +18,57 @@ Improvements over previous MobileNetV2 classifier:
 Classes: green (immature), yellow (mature), brown (fully ripe)
 """
 
+import sys
+import hashlib
+import threading
 import numpy as np
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List, Union
 import json
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import INFERENCE_THREADS, configure_tf_threading
+
 MODELS_DIR = Path(__file__).parent
 CNN_MODEL_PATH = MODELS_DIR / "cnn_color_classifier.keras"
 CNN_TFLITE_PATH = MODELS_DIR / "cnn_color_classifier.tflite"
 CLASS_NAMES = ["brown", "green", "yellow"]
+PREDICTION_CACHE_SIZE = 128        # Recent crop results kept per classifier
+PREDICTION_CACHE_MIN_CONFIDENCE = 0.7  # Single-pass results below this aren't cached
+
+# Heavy imports are resolved once, on first use, and cached here
+_cv2 = None
+_tf = None
+_PILImage = None
+
+
+def _get_cv2():
+    """Import OpenCV on first use and return the cached module."""
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
+
+def _get_tf():
+    """Import TensorFlow on first use and return the cached module."""
+    global _tf
+    if _tf is None:
+        import tensorflow as tf
+        configure_tf_threading(tf)
+        _tf = tf
+    return _tf
+
+
+def _get_pil_image():
+    """Import PIL.Image on first use and return the cached module."""
+    global _PILImage
+    if _PILImage is None:
+        from PIL import Image as PILImage
+        _PILImage = PILImage
+    return _PILImage
 
 
 class CNNColorClassifier:
@@ -61,9 +103,22 @@ class CNNColorClassifier:
         self.architecture = architecture
         self.use_tta = use_tta
         self.model = None
+        self.interpreter = None
+        self._infer_fn = None
+        self._input_index = None
+        self._output_index = None
+        self._interpreter_batch = None
+        self._input_dtype = np.float32
+        self._input_quant = (0.0, 0)
+        self._output_dtype = np.float32
+        self._output_quant = (0.0, 0)
         self.model_loaded = False
         self.class_names = CLASS_NAMES
         self.input_size = (224, 224)
+        # FIFO cache: crop hash -> prediction (dicts keep insertion order);
+        # shared by the API's request threads, so guarded by a lock
+        self._pred_cache: Dict[bytes, Dict] = {}
+        self._pred_cache_lock = threading.Lock()
         
         if model_path:
             self.model_path = Path(model_path)
@@ -71,18 +126,34 @@ class CNNColorClassifier:
             self.model_path = CNN_MODEL_PATH
         else:
             self.model_path = CNN_MODEL_PATH
+        self.tflite_path = self.model_path.with_suffix(".tflite")
         
         self._load_model()
     
     def _load_model(self):
-        """Load the trained CNN model."""
+        """Load the trained CNN model (TFLite preferred, Keras as fallback)."""
         try:
-            import tensorflow as tf
+            tf = _get_tf()
             
-            if self.model_path.exists():
-                self.model = tf.keras.models.load_model(str(self.model_path))
+            # A TFLite export older than the Keras model predates the last
+            # retrain, so it is ignored until quantize.py is run again
+            use_tflite = self.tflite_path.exists() and (
+                not self.model_path.exists() or
+                self.tflite_path.stat().st_mtime >= self.model_path.stat().st_mtime
+            )
+            if self.tflite_path.exists() and not use_tflite:
+                print(f"⚠ CNN TFLite export is older than {self.model_path.name}, "
+                      "using the Keras model (re-run quantize.py cnn)")
+            
+            if use_tflite or self.model_path.exists():
+                if use_tflite:
+                    self._load_tflite(tf)
+                    print(f"✓ CNN color classifier (TFLite) loaded from: {self.tflite_path}")
+                else:
+                    self.model = tf.keras.models.load_model(str(self.model_path))
+                    self._infer_fn = self._build_infer_fn(tf)
+                    print(f"✓ CNN color classifier loaded from: {self.model_path}")
                 self.model_loaded = True
-                print(f"✓ CNN color classifier loaded from: {self.model_path}")
                 
                 # Load class indices if available
                 indices_path = self.model_path.parent / "cnn_class_indices.json"
@@ -102,6 +173,97 @@ class CNNColorClassifier:
             print(f"⚠ Error loading CNN model: {e}")
             self.model_loaded = False
     
+    def _load_tflite(self, tf):
+        """
+        Create the TFLite interpreter and cache its tensor indices.
+        
+        TFLite applies the XNNPACK CPU delegate by default; num_threads
+        (INFERENCE_THREADS["tflite"], one per core unless overridden) sets
+        how many threads it uses. Full-integer models produced by
+        quantize.py are also supported (their quantization params are kept
+        so inputs/outputs can be (de)quantized in _run_model). An
+        interpreter is not thread-safe, so calls are serialized by
+        _interpreter_lock.
+        """
+        self._interpreter_lock = threading.Lock()
+        self.interpreter = tf.lite.Interpreter(
+            model_path=str(self.tflite_path),
+            num_threads=INFERENCE_THREADS["tflite"]
+        )
+        self.interpreter.allocate_tensors()
+        input_detail = self.interpreter.get_input_details()[0]
+        output_detail = self.interpreter.get_output_details()[0]
+        self._input_index = input_detail["index"]
+        self._output_index = output_detail["index"]
+        self._interpreter_batch = int(input_detail["shape"][0])
+        self._input_dtype = input_detail["dtype"]
+        self._input_quant = input_detail["quantization"]
+        self._output_dtype = output_detail["dtype"]
+        self._output_quant = output_detail["quantization"]
+    
+    def _build_infer_fn(self, tf):
+        """
+        Trace the Keras model once into a concrete graph function.
+        
+        The signature fixes the image shape but leaves the batch dimension
+        open, so both the single-image and the 6-image TTA batch reuse the
+        same graph without retracing or going through Keras .predict().
+        """
+        try:
+            return tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[
+                    tf.TensorSpec([None, *self.input_size, 3], tf.float32)
+                ],
+            ).get_concrete_function()
+        except Exception as e:
+            print(f"⚠ Could not trace CNN model, using Keras predict: {e}")
+            return None
+    
+    def _run_model(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run a (N, H, W, 3) uint8 RGB batch through the loaded model.
+        
+        Float models get the usual [0, 1] scaling. Integer-input models are
+        fed the pixels directly when their input scale is 1/255 with a zero
+        offset (the usual result of calibrating on [0, 1] data), and are
+        requantized otherwise.
+        """
+        if self.interpreter is None:
+            batch = batch.astype(np.float32) / 255.0
+            if self._infer_fn is not None:
+                return self._infer_fn(_get_tf().constant(batch)).numpy()
+            return self.model.predict(batch, verbose=0)
+        
+        if self._input_dtype == np.float32:
+            batch = batch.astype(np.float32) / 255.0
+        else:
+            scale, zero_point = self._input_quant
+            if not (self._input_dtype == np.uint8 and zero_point == 0
+                    and abs(scale * 255.0 - 1.0) < 1e-3):
+                info = np.iinfo(self._input_dtype)
+                batch = np.clip(
+                    np.round(batch / (255.0 * scale) + zero_point),
+                    info.min, info.max
+                ).astype(self._input_dtype)
+        
+        with self._interpreter_lock:
+            # Resize only when the batch size changes (1 vs TTA batch), so
+            # the steady state never re-allocates tensors
+            if batch.shape[0] != self._interpreter_batch:
+                self.interpreter.resize_tensor_input(self._input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self._interpreter_batch = batch.shape[0]
+            
+            self.interpreter.set_tensor(self._input_index, batch)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output_index).copy()
+        
+        if self._output_dtype != np.float32:
+            scale, zero_point = self._output_quant
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+    
     def predict(
         self,
         image,
@@ -128,8 +290,7 @@ class CNNColorClassifier:
             return self._fallback_hsv_classify(image, fruit_bbox)
         
         try:
-            import tensorflow as tf
-            import cv2
+            cv2 = _get_cv2()
             
             # Load image
             img = self._load_image(image)
@@ -148,6 +309,14 @@ class CNNColorClassifier:
                 y2 = min(h, y2 + pad)
                 img = img[y1:y2, x1:x2]
             
+            # Near-identical crops (e.g. adjacent video frames) reuse the
+            # previous result instead of running inference again
+            cache_key = self._crop_cache_key(img)
+            with self._pred_cache_lock:
+                cached = self._pred_cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "probabilities": dict(cached["probabilities"])}
+            
             # Preprocess
             img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
             
@@ -156,9 +325,8 @@ class CNNColorClassifier:
                 predictions = self._predict_with_tta(img_rgb)
             else:
                 img_resized = cv2.resize(img_rgb, self.input_size)
-                img_normalized = img_resized.astype(np.float32) / 255.0
-                img_batch = np.expand_dims(img_normalized, 0)
-                predictions = self.model.predict(img_batch, verbose=0)[0]
+                img_batch = np.expand_dims(img_resized, 0)
+                predictions = self._run_model(img_batch)[0]
             
             # Map to class names
             probs = {}
@@ -168,7 +336,7 @@ class CNNColorClassifier:
             
             predicted = max(probs, key=probs.get)
             
-            return {
+            result = {
                 "predicted_color": predicted,
                 "confidence": probs[predicted],
                 "probabilities": probs,
@@ -176,10 +344,37 @@ class CNNColorClassifier:
                 "method": "cnn_enhanced"
             }
             
+            if self.use_tta or result["confidence"] >= PREDICTION_CACHE_MIN_CONFIDENCE:
+                self._cache_prediction(cache_key, result)
+            
+            return result
+            
         except Exception as e:
             print(f"⚠ CNN prediction error: {e}, falling back to HSV")
             return self._fallback_hsv_classify(image, fruit_bbox)
     
+    def _crop_cache_key(self, img: np.ndarray) -> bytes:
+        """
+        Hash a 16x16 thumbnail of the crop, quantized to 32 levels per
+        channel, so crops that differ only by slight noise or a pixel of
+        jitter usually share a cache entry (a thumbnail value that moves
+        across a level boundary still misses).
+        """
+        cv2 = _get_cv2()
+        thumb = cv2.resize(img, (16, 16), interpolation=cv2.INTER_AREA)
+        thumb >>= 3
+        digest = hashlib.blake2b(thumb.tobytes(), digest_size=8)
+        digest.update(b"tta" if self.use_tta else b"single")
+        return digest.digest()
+    
+    def _cache_prediction(self, key: bytes, result: Dict):
+        """Store a prediction, evicting the oldest entry when full."""
+        entry = {**result, "probabilities": dict(result["probabilities"])}
+        with self._pred_cache_lock:
+            if len(self._pred_cache) >= PREDICTION_CACHE_SIZE:
+                self._pred_cache.pop(next(iter(self._pred_cache)), None)
+            self._pred_cache[key] = entry
+    
     def _predict_with_tta(self, img_rgb: np.ndarray) -> np.ndarray:
         """
         Test-Time Augmentation: Average predictions over multiple
@@ -187,7 +382,7 @@ class CNNColorClassifier:
         
         Augmentations: original, h-flip, slight rotations, brightness variants
         """
-        import cv2
+        cv2 = _get_cv2()
         
         augmented_images = []
         
@@ -210,17 +405,13 @@ class CNNColorClassifier:
             bright = np.clip(img_rgb.astype(np.float32) * factor, 0, 255).astype(np.uint8)
             augmented_images.append(bright)
         
-        # Preprocess all
-        batch = []
-        for aug_img in augmented_images:
-            resized = cv2.resize(aug_img, self.input_size)
-            normalized = resized.astype(np.float32) / 255.0
-            batch.append(normalized)
-        
-        batch = np.array(batch)
+        # Resize all (scaling to model input happens in _run_model)
+        batch = np.stack([
+            cv2.resize(aug_img, self.input_size) for aug_img in augmented_images
+        ])
         
         # Predict all at once
-        all_preds = self.model.predict(batch, verbose=0)
+        all_preds = self._run_model(batch)
         
         # Average predictions
         avg_pred = np.mean(all_preds, axis=0)
@@ -233,7 +424,7 @@ class CNNColorClassifier:
     def _fallback_hsv_classify(self, image, fruit_bbox=None) -> Dict:
         """Fallback to HSV-based classification when CNN unavailable."""
         try:
-            import cv2
+            cv2 = _get_cv2()
             
             img = self._load_image(image)
             if img is None:
@@ -260,9 +451,9 @@ class CNNColorClassifier:
             brown_mask = cv2.inRange(hsv, (5, 40, 30), (25, 200, 200))
             
             total = max(1, img.shape[0] * img.shape[1])
-            green_ratio = np.sum(green_mask > 0) / total
-            yellow_ratio = np.sum(yellow_mask > 0) / total
-            brown_ratio = np.sum(brown_mask > 0) / total
+            green_ratio = cv2.countNonZero(green_mask) / total
+            yellow_ratio = cv2.countNonZero(yellow_mask) / total
+            brown_ratio = cv2.countNonZero(brown_mask) / total
             
             total_ratio = max(0.001, green_ratio + yellow_ratio + brown_ratio)
             probs = {
@@ -300,8 +491,8 @@ class CNNColorClassifier:
     
     def _load_image(self, image) -> Optional[np.ndarray]:
         """Load image from various sources."""
-        import cv2
-        from PIL import Image as PILImage
+        cv2 = _get_cv2()
+        PILImage = _get_pil_image()
         
         if isinstance(image, (str, Path)):
             return cv2.imread(str(image))
@@ -293,10 +293,12 @@ class SimpleColorClassifier:
             "hsv_v_min": 200         # Minimum value for white
         }
     
-    def _detect_white_background(self, img):
+    def _detect_white_background(self, img, hsv=None):
         """
         Detect if the image has a white background (like bond paper).
         
+        `hsv` is the image's BGR->HSV conversion when the caller already has it.
+        
         Returns:
             Tuple (is_white_bg: bool, white_mask: ndarray, coverage: float)
         """
@@ -304,7 +306,8 @@ class SimpleColorClassifier:
         import numpy as np
         
         h, w = img.shape[:2]
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         
         # Method 1: RGB-based white detection
         # White pixels have high values in all channels and similar values
@@ -349,7 +352,7 @@ class SimpleColorClassifier:
         
         return is_white_bg, combined_white_mask, coverage
     
-    def _detect_spots(self, img, fruit_mask):
+    def _detect_spots(self, img, fruit_mask, hsv=None):
         """
         Detect spots (brown, black, dark patches) on the fruit surface.
         
@@ -369,8 +372,8 @@ class SimpleColorClassifier:
         import numpy as np
         
         h, w = img.shape[:2]
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        b, g, r = cv2.split(img)
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         
         spots_mask = np.zeros((h, w), dtype=np.uint8)
         fruit_pixels = fruit_mask > 0
@@ -482,7 +485,7 @@ class SimpleColorClassifier:
         
         return clean_mask
     
-    def _analyze_color_distribution(self, img, clean_mask, fruit_mask, spots_mask):
+    def _analyze_color_distribution(self, img, clean_mask, fruit_mask, spots_mask, hsv=None):
         """
         Analyze color distribution with spot-aware processing.
         
@@ -494,7 +497,8 @@ class SimpleColorClassifier:
         import cv2
         import numpy as np
         
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         
         result = {
             "base_color_analysis": {},
@@ -546,20 +550,27 @@ class SimpleColorClassifier:
             # Also consider saturation - true greens have moderate to high saturation
             s_clean = clean_pixels[:, 1]
             
+            # One counting pass over hue (OpenCV H is 0-179); each zone is
+            # then a sum over a slice of the counts
+            h_counts = np.bincount(h_clean, minlength=180)
+            
+            # Light olive green: H=15-18 only if saturation is moderate+
+            # (not washed out). uint8 subtraction wraps, so H-15 < 3 is
+            # the 15 <= H < 18 band in one comparison.
+            olive = np.count_nonzero(((h_clean - np.uint8(15)) < 3) & (s_clean >= 35))
+            
             # Extended green zone: covers olive-green (H=18+) and vivid green
-            # Also include H=15-18 if saturation is moderate+ (not washed out)
-            green_zone = ((h_clean >= 18) & (h_clean <= 90)) | \
-                        ((h_clean >= 15) & (h_clean < 18) & (s_clean >= 35))  # Light olive green
+            green_count = h_counts[18:91].sum() + olive
             
             # True yellow (warm yellow, not greenish-yellow)
-            yellow_zone = (h_clean >= 10) & (h_clean < 18) & ~green_zone
+            yellow_count = h_counts[10:18].sum() - olive
             
             # Brown/red zone
-            brown_zone = (h_clean < 10) | (h_clean > 160)
+            brown_count = h_counts[:10].sum() + h_counts[161:].sum()
             
-            green_pct = np.sum(green_zone) / len(h_clean)
-            yellow_pct = np.sum(yellow_zone) / len(h_clean)
-            brown_pct = np.sum(brown_zone) / len(h_clean)
+            green_pct = green_count / len(h_clean)
+            yellow_pct = yellow_count / len(h_clean)
+            brown_pct = brown_count / len(h_clean)
             
             # Normalize to 100%
             total_pct = green_pct + yellow_pct + brown_pct
@@ -580,7 +591,7 @@ class SimpleColorClassifier:
         
         return result
     
-    def _create_fruit_mask_from_white_bg(self, img, white_mask):
+    def _create_fruit_mask_from_white_bg(self, img, white_mask, hsv=None):
         """
         Create a fruit mask by excluding white background pixels.
         When the fruit is on white background, the fruit is everything that's NOT white.
@@ -588,6 +599,7 @@ class SimpleColorClassifier:
         Args:
             img: BGR image
             white_mask: Mask of white background pixels
+            hsv: Precomputed HSV image (optional)
             
         Returns:
             Mask of fruit pixels (inverted white mask, cleaned up)
@@ -601,7 +613,8 @@ class SimpleColorClassifier:
         fruit_mask = cv2.bitwise_not(white_mask)
         
         # Also exclude very dark pixels (shadows)
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         v_channel = hsv[:, :, 2]
         not_dark = (v_channel > 30).astype(np.uint8) * 255
         fruit_mask = cv2.bitwise_and(fruit_mask, not_dark)
@@ -645,7 +658,7 @@ class SimpleColorClassifier:
         # If no valid contours, return the cleaned fruit mask
         return fruit_mask
     
-    def _segment_fruit(self, img):
+    def _segment_fruit(self, img, hsv=None):
         """
         Segment the fruit from the background using multiple techniques.
         Returns a mask where the fruit region is white.
@@ -663,11 +676,13 @@ class SimpleColorClassifier:
         h, w = img.shape[:2]
         
         # STEP 0: Check for white background first
-        is_white_bg, white_mask, white_coverage = self._detect_white_background(img)
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        is_white_bg, white_mask, white_coverage = self._detect_white_background(img, hsv)
         
         if is_white_bg:
             # White background detected - use simple inversion for segmentation
-            fruit_mask = self._create_fruit_mask_from_white_bg(img, white_mask)
+            fruit_mask = self._create_fruit_mask_from_white_bg(img, white_mask, hsv)
             fruit_pixels = cv2.countNonZero(fruit_mask)
             
             # If we got a reasonable fruit mask, use it
@@ -680,8 +695,6 @@ class SimpleColorClassifier:
         self._white_bg_detected = False
         self._white_coverage = 0.0
         
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        
         # Get BGR channels
         b, g, r = cv2.split(img)
         
@@ -950,15 +963,19 @@ class SimpleColorClassifier:
         else:
             img = image
         
+        # Convert once; segmentation, spot detection and the distribution /
+        # fallback analyses all read the same full-image HSV array
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        
         # ================================================================
         # STEP 1: Segment the fruit from background
         # ================================================================
-        fruit_mask = self._segment_fruit(img)
+        fruit_mask = self._segment_fruit(img, hsv)
         
         # ================================================================
         # STEP 2: Detect spots (brown/black patches) on the fruit
         # ================================================================
-        spots_mask, spot_coverage, spot_info = self._detect_spots(img, fruit_mask)
+        spots_mask, spot_coverage, spot_info = self._detect_spots(img, fruit_mask, hsv)
         
         # ================================================================
         # STEP 3: Create clean mask (fruit minus spots) for base color analysis
@@ -968,7 +985,9 @@ class SimpleColorClassifier:
         # ================================================================
         # STEP 4: Analyze color distribution (base color + spots separately)
         # ================================================================
-        color_distribution = self._analyze_color_distribution(img, clean_mask, fruit_mask, spots_mask)
+        color_distribution = self._analyze_color_distribution(
+            img, clean_mask, fruit_mask, spots_mask, hsv
+        )
         
         # ================================================================
         # STEP 5: Direct RGB channel analysis on CLEAN region (no spots)
@@ -1075,7 +1094,7 @@ class SimpleColorClassifier:
         if total_score > 0:
             combined_scores = {k: v / total_score for k, v in combined_scores.items()}
         else:
-            combined_scores = self._fallback_analysis(img, fruit_mask)
+            combined_scores = self._fallback_analysis(img, fruit_mask, hsv)
         
         predicted_color = max(combined_scores, key=combined_scores.get)
         confidence = combined_scores[predicted_color]
@@ -1115,6 +1134,30 @@ class SimpleColorClassifier:
             "debug_info": debug_info
         }
     
+    def detect_spots_only(self, img) -> dict:
+        """
+        Spot fields of predict() without the colour analysis.
+        
+        Runs only fruit segmentation and spot detection (steps 1-2), for
+        callers that already have a colour and just need the spot info.
+        
+        Args:
+            img: BGR numpy array
+            
+        Returns:
+            Dictionary with has_spots and spot_coverage_percent, as in predict()
+        """
+        import cv2
+        
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        fruit_mask = self._segment_fruit(img, hsv)
+        _, spot_coverage, _ = self._detect_spots(img, fruit_mask, hsv)
+        
+        return {
+            "has_spots": spot_coverage > 0.05,
+            "spot_coverage_percent": round(spot_coverage * 100, 1),
+        }
+    
     def _analyze_rgb_channels(self, img, mask):
         """
         Analyze RGB channels directly to detect greenness.
@@ -1202,14 +1245,15 @@ class SimpleColorClassifier:
         
         return scores
     
-    def _fallback_analysis(self, img, mask):
+    def _fallback_analysis(self, img, mask, hsv=None):
         """
         Fallback color analysis using direct HSV range matching on masked pixels.
         """
         import cv2
         import numpy as np
         
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         
         scores = {}
         masked_hsv = hsv[mask > 0] if np.any(mask > 0) else hsv.reshape(-1, 3)
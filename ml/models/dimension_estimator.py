@@ -604,6 +604,21 @@ class DimensionEstimator:
         max_r = int(w * 0.11)
         min_dist = max(15, int(w * 0.04))
         
+        # With a YOLO fruit size, narrow the range further to the coin radii
+        # that the fruit-dimension sanity check below can accept, so the
+        # Hough accumulator only votes over plausible radii
+        coin_diameter_cm = self.reference_info.get("diameter", 2.4)
+        if fruit_bbox and "size" in fruit_bbox:
+            fruit_len_px = max(fruit_bbox["size"]) * scale
+            fruit_wid_px = min(fruit_bbox["size"]) * scale
+            r_per_cm = coin_diameter_cm / 2
+            fit_min_r = max(fruit_len_px / 9.0, fruit_wid_px / 7.0) * r_per_cm
+            fit_max_r = min(fruit_len_px / 2.5, fruit_wid_px / 1.5) * r_per_cm
+            min_r = max(min_r, int(fit_min_r) - 1)
+            max_r = min(max_r, int(np.ceil(fit_max_r)) + 1)
+            if min_r > max_r:
+                return {"detected": False}
+        
         # === STEP 3: HoughCircles with tight coin-sized constraint ===
         circles = cv2.HoughCircles(
             blurred, cv2.HOUGH_GRADIENT, dp=1.2,
@@ -618,8 +633,11 @@ class DimensionEstimator:
         # Cap at 10 candidates
         circle_list = circles[0][:10]
         
-        # Precompute shared data on small image
+        # Precompute shared data on small image. A ring point "hits" when any
+        # edge pixel lies in its 3x3 neighbourhood, i.e. where the edge map
+        # dilated by 3x3 is set, so all ring points are tested with one gather
         edges = cv2.Canny(blurred, 50, 150)
+        edges_near = cv2.dilate(edges, np.ones((3, 3), np.uint8))
         hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
         
         # Scale fruit bbox to small image coords for exclusion
@@ -667,11 +685,7 @@ class DimensionEstimator:
             px = (cx + r * cos_a).astype(int)
             py = (cy + r * sin_a).astype(int)
             valid = (px >= 1) & (px < w - 1) & (py >= 1) & (py < h - 1)
-            edge_hits = 0
-            for i in range(n_ring):
-                if valid[i]:
-                    if np.any(edges[py[i]-1:py[i]+2, px[i]-1:px[i]+2]):
-                        edge_hits += 1
+            edge_hits = int(np.count_nonzero(edges_near[py[valid], px[valid]]))
             edge_ratio = edge_hits / max(1, int(np.sum(valid)))
             score += min(0.25, edge_ratio * 0.42)
             
@@ -750,8 +764,6 @@ class DimensionEstimator:
         candidates.sort(key=lambda x: x[0], reverse=True)
         
         # Validate top candidates against fruit dimensions
-        coin_diameter_cm = self.reference_info.get("diameter", 2.4)
-        
         for score, cx, cy, r in candidates:
             if score < 0.55:
                 break
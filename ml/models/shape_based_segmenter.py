@@ -10,10 +10,43 @@ Major improvements over v1:
 5. Better mask refinement with ellipse prior
 """
 
+import math
 import cv2
 import numpy as np
 from typing import Tuple, Optional, Dict
 
+# Candidate search, shape fitting and refinement run with the longest image
+# side capped at this size; only the final mask/contour/bbox are scaled back
+SEGMENT_WORK_MAX_DIM = 512
+
+# Weights of the per-candidate scores in the final confidence (sum to 1.0)
+CANDIDATE_SCORE_WEIGHTS = {
+    "shape_score": 0.35,
+    "texture_score": 0.25,
+    "talisay_color_score": 0.20,
+    "color_score": 0.10,
+    "position_score": 0.10,
+}
+_SCORE_NAMES = tuple(CANDIDATE_SCORE_WEIGHTS)
+_SCORE_WEIGHTS = np.array([CANDIDATE_SCORE_WEIGHTS[n] for n in _SCORE_NAMES])
+
+
+def _uint8_percentile(channel: np.ndarray, q: float) -> float:
+    """
+    np.percentile (linear interpolation) for a uint8 image, in O(n).
+    
+    Counting select: the two order statistics around the percentile
+    position are read off the cumulative 256-bin histogram instead of
+    sorting the pixels.
+    """
+    cumulative = cv2.calcHist([channel], [0], None, [256], [0, 256]).ravel().cumsum()
+    pos = (channel.size - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, channel.size - 1)
+    v_lo = int(np.searchsorted(cumulative, lo, side="right"))
+    v_hi = int(np.searchsorted(cumulative, hi, side="right"))
+    return v_lo + (v_hi - v_lo) * (pos - lo)
+
 
 class ShapeBasedSegmenter:
     """
@@ -42,6 +75,29 @@ class ShapeBasedSegmenter:
         self.shadow_v_percentile = 25
         self.shadow_max_saturation = 50
         self.dark_absolute_threshold = 40
+        
+        # Stop running further detectors once a candidate is this convincing
+        self.early_exit_confidence = 0.6
+        self.early_exit_shape_score = 0.85
+        
+        # (image shape, centre-to-corner distance) of the last scored image
+        self._position_norm = (None, 1.0)
+        
+        # Elliptical structuring elements, built once and shared by all calls
+        self._k3 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._k5 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self._k7 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+        self._k9 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (9, 9))
+        self._k15 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
+        
+        # Unit-circle lookup tables for OpenCV hue (0-179 spans 360 degrees)
+        hue_angle = np.arange(256, dtype=np.float64) * (2 * np.pi / 180)
+        self._hue_cos_lut = np.cos(hue_angle).astype(np.float32)
+        self._hue_sin_lut = np.sin(hue_angle).astype(np.float32)
+        
+        # V-channel "usable brightness" band (50 < V < 240) as a 0/255 LUT
+        self._bright_lut = np.zeros(256, dtype=np.uint8)
+        self._bright_lut[51:240] = 255
     
     def segment_fruit_by_shape(
         self,
@@ -51,7 +107,12 @@ class ShapeBasedSegmenter:
         """
         Main segmentation method focusing on shape detection.
         """
+        full_img = img
         h, w = img.shape[:2]
+        scale = min(1.0, SEGMENT_WORK_MAX_DIM / max(h, w))
+        if scale < 1.0:
+            img = cv2.resize(img, None, fx=scale, fy=scale,
+                             interpolation=cv2.INTER_AREA)
         
         result = {
             "success": False,
@@ -63,112 +124,180 @@ class ShapeBasedSegmenter:
             "method": "shape_based"
         }
         
-        # Step 1: Detect and exclude shadows AGGRESSIVELY
-        shadow_mask = self._detect_shadows(img)
-        result["shadow_mask"] = shadow_mask
-        
-        # Step 2: Get initial fruit candidates
-        candidates = self._get_fruit_candidates(img, shadow_mask)
-        
-        if not candidates:
-            return result
-        
-        # Step 3: Filter candidates by elliptical shape
-        valid_candidates = self._filter_by_shape(candidates, img)
-        
-        if not valid_candidates:
-            return result
+        # Colour conversions shared by every stage below
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        _, s_ch, v_ch = cv2.split(hsv)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # Step 4: Score and select best
-        best_candidate = self._select_best_fruit(valid_candidates, img, shadow_mask)
+        # Step 1: Detect and exclude shadows AGGRESSIVELY
+        shadow_mask = self._detect_shadows(img, s_ch, v_ch)
+        result["shadow_mask"] = self._upscale_mask(shadow_mask, scale, (h, w))
+        not_shadow = cv2.bitwise_not(shadow_mask)
+        
+        # Steps 2-4: detector by detector, filter new candidates by
+        # elliptical shape, score them and stop on a clear winner
+        best_candidate = None
+        for candidates in self._get_fruit_candidates(hsv, s_ch, v_ch, gray, not_shadow):
+            new_candidates = [c for c in candidates if "shape_checked" not in c]
+            for cand in new_candidates:
+                cand["shape_checked"] = True
+            self._filter_by_shape(new_candidates, img)
+            
+            valid_candidates = [c for c in candidates if "shape_score" in c]
+            best_candidate = self._select_best_fruit(valid_candidates, hsv, gray)
+            if (best_candidate is not None and
+                    best_candidate["confidence"] > self.early_exit_confidence and
+                    best_candidate["shape_score"] > self.early_exit_shape_score):
+                break
         
         if best_candidate is None:
             return result
         
         # Step 5: Refine mask with ellipse fitting + shadow exclusion
+        best_mask = self._roi_to_full_mask(
+            best_candidate["bbox"], best_candidate["mask"], gray.shape
+        )
         refined_mask = self._refine_fruit_mask(
-            img, best_candidate["mask"], best_candidate["contour"], shadow_mask,
-            ellipse=best_candidate.get("ellipse")
+            s_ch, v_ch, best_mask, best_candidate["contour"],
+            not_shadow, ellipse=best_candidate.get("ellipse")
         )
         
+        contour = best_candidate["contour"]
+        bbox = best_candidate["bbox"]
+        if scale < 1.0:
+            contour = np.rint(contour / scale).astype(np.int32)
+            bbox = tuple(int(round(v / scale)) for v in bbox)
+        
         result.update({
             "success": True,
-            "mask": refined_mask,
-            "contour": best_candidate["contour"],
-            "bbox": best_candidate["bbox"],
+            "mask": self._upscale_mask(refined_mask, scale, (h, w)),
+            "contour": contour,
+            "bbox": bbox,
             "confidence": best_candidate["confidence"],
             "shape_score": best_candidate.get("shape_score", 0.5),
             "texture_score": best_candidate.get("texture_score", 0.5)
         })
         
         if return_debug:
-            result["debug"] = self._create_debug_info(img, result)
+            result["debug"] = self._create_debug_info(full_img, result)
         
         return result
     
-    def _detect_shadows(self, img: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _upscale_mask(mask: np.ndarray, scale: float,
+                      size: Tuple[int, int]) -> np.ndarray:
+        """Resize a working-resolution mask back to (h, w) with smooth edges."""
+        if scale >= 1.0:
+            return mask
+        h, w = size
+        mask = cv2.resize(mask, (w, h), interpolation=cv2.INTER_LINEAR)
+        _, mask = cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY)
+        return mask
+    
+    def _detect_shadows(self, img: np.ndarray, s_ch: np.ndarray,
+                        v_ch: np.ndarray) -> np.ndarray:
         """
         AGGRESSIVELY detect shadows, dark regions, and black areas.
         
         Any dark/black color outside the fruit is treated as shadow.
         This prevents dark backgrounds from being included in the fruit mask.
         """
-        h, w = img.shape[:2]
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        h_ch, s_ch, v_ch = cv2.split(hsv)
+        dark_threshold = _uint8_percentile(v_ch, self.shadow_v_percentile)
         
-        # Method 1: Absolute dark - V < 40 is definitely shadow
-        absolute_dark = v_ch < self.dark_absolute_threshold
+        # Methods 1, 2 and 4 are (V-range AND S-range) tests, one bit each:
+        # look up V and S bits once, AND them, and any surviving bit is shadow
+        v_lut, s_lut = self._shadow_bit_luts(dark_threshold)
+        bits = cv2.LUT(v_ch, v_lut)
+        cv2.bitwise_and(bits, cv2.LUT(s_ch, s_lut), dst=bits)
+        shadow_mask = cv2.compare(bits, 0, cv2.CMP_GT)
         
-        # Method 2: Relative dark + low saturation
-        dark_threshold = np.percentile(v_ch, self.shadow_v_percentile)
-        relative_dark = v_ch < dark_threshold
-        low_sat = s_ch < self.shadow_max_saturation
-        relative_shadow = relative_dark & low_sat
-        
-        # Method 3: Near-black (sum of all channels < 120)
+        # Method 3: Near-black (sum of all channels < 120); the saturating
+        # uint8 sum is exact below 255
         b, g, r = cv2.split(img)
-        near_black = (r.astype(int) + g.astype(int) + b.astype(int)) < 120
-        
-        # Method 4: Dark gray (low sat + low value)
-        dark_gray = (s_ch < 40) & (v_ch < 100)
-        
-        # Combine all
-        shadow_mask = (absolute_dark | relative_shadow | near_black | dark_gray).astype(np.uint8) * 255
+        channel_sum = cv2.add(b, g)
+        cv2.add(channel_sum, r, dst=channel_sum)
+        near_black = cv2.compare(channel_sum, 120, cv2.CMP_LT)
+        cv2.bitwise_or(shadow_mask, near_black, dst=shadow_mask)
         
         # Clean up
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_CLOSE, kernel)
-        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_OPEN, kernel)
+        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_CLOSE, self._k7)
+        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_OPEN, self._k7)
         
         return shadow_mask
     
-    def _get_fruit_candidates(self, img: np.ndarray, shadow_mask: np.ndarray) -> list:
-        """Get initial fruit candidates using multiple methods."""
-        candidates = []
-        
-        # Method 1: Edge-based
-        candidates.extend(self._detect_by_edges(img, shadow_mask))
-        
-        # Method 2: Saturation-based
-        candidates.extend(self._detect_by_saturation(img, shadow_mask))
+    def _shadow_bit_luts(self, dark_threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-channel bit tables for the (V, S) shadow rules:
+        bit 0 - Absolute dark: V < 40 is definitely shadow (any S)
+        bit 1 - Relative dark (below the V percentile) + low saturation
+        bit 2 - Dark gray: low sat + low value
+        """
+        values = np.arange(256)
+        v_lut = np.zeros(256, dtype=np.uint8)
+        s_lut = np.ones(256, dtype=np.uint8)
+        v_lut[values < self.dark_absolute_threshold] |= 1
+        v_lut[values < dark_threshold] |= 2
+        s_lut[values < self.shadow_max_saturation] |= 2
+        v_lut[values < 100] |= 4
+        s_lut[values < 40] |= 4
+        return v_lut, s_lut
+    
+    def _get_fruit_candidates(self, hsv: np.ndarray, s_ch: np.ndarray,
+                              v_ch: np.ndarray, gray: np.ndarray,
+                              not_shadow: np.ndarray):
+        """
+        Get fruit candidates using multiple methods, cheapest first.
         
-        # Method 3: Talisay-color-based (NEW - looks for green/yellow/brown)
-        candidates.extend(self._detect_by_talisay_colors(img, shadow_mask))
+        Yields the de-duplicated candidate list after each detector, so the
+        caller can stop once a clear winner has been found. A detector
+        only runs when the caller asks for the next list, so an early exit
+        skips the remaining ones entirely.
+        """
+        detectors = (
+            # Method 1: Saturation-based
+            lambda: self._detect_by_saturation(s_ch, v_ch, not_shadow),
+            # Method 2: Edge-based
+            lambda: self._detect_by_edges(gray, not_shadow),
+            # Method 3: Talisay-color-based (NEW - looks for green/yellow/brown)
+            lambda: self._detect_by_talisay_colors(hsv, not_shadow),
+        )
         
-        # Deduplicate
-        return self._remove_duplicate_candidates(candidates)
+        candidates = []
+        for detect in detectors:
+            candidates = self._remove_duplicate_candidates(candidates + detect())
+            yield candidates
     
-    def _detect_by_edges(self, img, shadow_mask) -> list:
+    @staticmethod
+    def _contour_to_roi_mask(cnt, not_shadow) -> Tuple[Tuple[int, int, int, int], np.ndarray]:
+        """
+        Fill a contour into a mask covering only its bounding box, with
+        shadow pixels removed. Returns (bbox, roi_mask).
+        """
+        x, y, bw, bh = cv2.boundingRect(cnt)
+        mask = np.zeros((bh, bw), dtype=np.uint8)
+        cv2.drawContours(mask, [cnt], -1, 255, -1, offset=(-x, -y))
+        cv2.bitwise_and(mask, not_shadow[y:y+bh, x:x+bw], dst=mask)
+        return (x, y, bw, bh), mask
+    
+    @staticmethod
+    def _roi_to_full_mask(bbox, roi_mask, shape) -> np.ndarray:
+        """Paste a bbox-sized candidate mask into a full-size zero mask."""
+        x, y, bw, bh = bbox
+        mask = np.zeros(shape[:2], dtype=np.uint8)
+        mask[y:y+bh, x:x+bw] = roi_mask
+        return mask
+    
+    def _detect_by_edges(self, gray, not_shadow) -> list:
         """Detect fruit using edge detection."""
-        h, w = img.shape[:2]
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        smooth = cv2.bilateralFilter(gray, 9, 75, 75)
+        h, w = gray.shape[:2]
+        # Bilateral at half resolution (d=5 there spans ~d=9 here); the range
+        # sigma is resolution-independent so edge preservation is unchanged
+        smooth = cv2.bilateralFilter(cv2.pyrDown(gray), 5, 75, 75)
+        smooth = cv2.pyrUp(smooth, dstsize=(w, h))
         edges = cv2.Canny(smooth, 30, 100)
-        edges = cv2.bitwise_and(edges, cv2.bitwise_not(shadow_mask))
+        cv2.bitwise_and(edges, not_shadow, dst=edges)
         
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        edges = cv2.dilate(edges, kernel, iterations=2)
+        edges = cv2.dilate(edges, self._k5, iterations=2)
         
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -177,30 +306,24 @@ class ShapeBasedSegmenter:
             area = cv2.contourArea(cnt)
             area_ratio = area / (h * w)
             if self.min_area_ratio < area_ratio < self.max_area_ratio:
-                mask = np.zeros((h, w), dtype=np.uint8)
-                cv2.drawContours(mask, [cnt], -1, 255, -1)
-                mask = cv2.bitwise_and(mask, cv2.bitwise_not(shadow_mask))
+                bbox, mask = self._contour_to_roi_mask(cnt, not_shadow)
                 candidates.append({
                     "contour": cnt, "mask": mask, "area": area,
-                    "bbox": cv2.boundingRect(cnt), "method": "edges"
+                    "bbox": bbox, "method": "edges"
                 })
         return candidates
     
-    def _detect_by_saturation(self, img, shadow_mask) -> list:
+    def _detect_by_saturation(self, s_channel, v_channel, not_shadow) -> list:
         """Detect fruit by saturation (fruits are more colorful)."""
-        h, w = img.shape[:2]
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        s_channel = hsv[:, :, 1]
-        v_channel = hsv[:, :, 2]
+        h, w = s_channel.shape[:2]
         
         _, sat_thresh = cv2.threshold(s_channel, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        brightness_mask = ((v_channel > 50) & (v_channel < 240)).astype(np.uint8) * 255
+        brightness_mask = cv2.LUT(v_channel, self._bright_lut)
         combined = cv2.bitwise_and(sat_thresh, brightness_mask)
-        combined = cv2.bitwise_and(combined, cv2.bitwise_not(shadow_mask))
+        cv2.bitwise_and(combined, not_shadow, dst=combined)
         
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-        combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel)
-        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
+        combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, self._k7)
+        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, self._k7)
         
         contours, _ = cv2.findContours(combined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -209,21 +332,18 @@ class ShapeBasedSegmenter:
             area = cv2.contourArea(cnt)
             area_ratio = area / (h * w)
             if self.min_area_ratio < area_ratio < self.max_area_ratio:
-                mask = np.zeros((h, w), dtype=np.uint8)
-                cv2.drawContours(mask, [cnt], -1, 255, -1)
-                mask = cv2.bitwise_and(mask, cv2.bitwise_not(shadow_mask))
+                bbox, mask = self._contour_to_roi_mask(cnt, not_shadow)
                 candidates.append({
                     "contour": cnt, "mask": mask, "area": area,
-                    "bbox": cv2.boundingRect(cnt), "method": "saturation"
+                    "bbox": bbox, "method": "saturation"
                 })
         return candidates
     
-    def _detect_by_talisay_colors(self, img, shadow_mask) -> list:
+    def _detect_by_talisay_colors(self, hsv, not_shadow) -> list:
         """
         NEW: Detect fruit specifically by Talisay color ranges (green/yellow/brown).
         """
-        h, w = img.shape[:2]
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        h, w = hsv.shape[:2]
         
         color_ranges = {
             "green": (np.array([25, 30, 30]), np.array([90, 255, 255])),
@@ -235,11 +355,10 @@ class ShapeBasedSegmenter:
         for _, (lower, upper) in color_ranges.items():
             full_mask = cv2.bitwise_or(full_mask, cv2.inRange(hsv, lower, upper))
         
-        full_mask = cv2.bitwise_and(full_mask, cv2.bitwise_not(shadow_mask))
+        cv2.bitwise_and(full_mask, not_shadow, dst=full_mask)
         
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (9, 9))
-        full_mask = cv2.morphologyEx(full_mask, cv2.MORPH_CLOSE, kernel)
-        full_mask = cv2.morphologyEx(full_mask, cv2.MORPH_OPEN, kernel)
+        full_mask = cv2.morphologyEx(full_mask, cv2.MORPH_CLOSE, self._k9)
+        full_mask = cv2.morphologyEx(full_mask, cv2.MORPH_OPEN, self._k9)
         
         contours, _ = cv2.findContours(full_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -248,12 +367,10 @@ class ShapeBasedSegmenter:
             area = cv2.contourArea(cnt)
             area_ratio = area / (h * w)
             if self.min_area_ratio < area_ratio < self.max_area_ratio:
-                mask = np.zeros((h, w), dtype=np.uint8)
-                cv2.drawContours(mask, [cnt], -1, 255, -1)
-                mask = cv2.bitwise_and(mask, cv2.bitwise_not(shadow_mask))
+                bbox, mask = self._contour_to_roi_mask(cnt, not_shadow)
                 candidates.append({
                     "contour": cnt, "mask": mask, "area": area,
-                    "bbox": cv2.boundingRect(cnt), "method": "talisay_color"
+                    "bbox": bbox, "method": "talisay_color"
                 })
         return candidates
     
@@ -263,18 +380,40 @@ class ShapeBasedSegmenter:
             return candidates
         
         candidates.sort(key=lambda x: x["area"], reverse=True)
+        
+        # Masks only cover their contour's bbox, so overlaps are counted on
+        # the shared part of two bboxes instead of full-image bitwise passes
+        pixel_areas = [cv2.countNonZero(cand["mask"]) for cand in candidates]
+        
         unique = []
-        for cand in candidates:
+        unique_areas = []
+        for cand, area_a in zip(candidates, pixel_areas):
+            ax, ay, aw, ah = cand["bbox"]
             is_dup = False
-            for existing in unique:
-                intersection = cv2.bitwise_and(cand["mask"], existing["mask"])
-                union = cv2.bitwise_or(cand["mask"], existing["mask"])
-                iou = cv2.countNonZero(intersection) / max(1, cv2.countNonZero(union))
+            for existing, area_b in zip(unique, unique_areas):
+                bx, by, bw, bh = existing["bbox"]
+                x0, y0 = max(ax, bx), max(ay, by)
+                x1, y1 = min(ax + aw, bx + bw), min(ay + ah, by + bh)
+                if x1 <= x0 or y1 <= y0:
+                    continue
+                
+                # Skip the raster pass when even a full overlap inside the
+                # bbox intersection could not reach IoU 0.5
+                best_inter = min((x1 - x0) * (y1 - y0), area_a, area_b)
+                if best_inter <= 0.5 * max(area_a, area_b):
+                    continue
+                
+                inter = cv2.countNonZero(cv2.bitwise_and(
+                    cand["mask"][y0-ay:y1-ay, x0-ax:x1-ax],
+                    existing["mask"][y0-by:y1-by, x0-bx:x1-bx]
+                ))
+                iou = inter / max(1, area_a + area_b - inter)
                 if iou > 0.5:
                     is_dup = True
                     break
             if not is_dup:
                 unique.append(cand)
+                unique_areas.append(area_a)
         return unique
     
     def _filter_by_shape(self, candidates: list, img: np.ndarray) -> list:
@@ -285,6 +424,15 @@ class ShapeBasedSegmenter:
             if len(cnt) < 5:
                 continue
             try:
+                # Cheapest test first: circularity reuses the contour area
+                # the detector already computed
+                perimeter = cv2.arcLength(cnt, True)
+                if perimeter == 0:
+                    continue
+                circularity = 4 * np.pi * cand["area"] / (perimeter ** 2)
+                if not (self.min_circularity <= circularity <= self.max_circularity):
+                    continue
+                
                 ellipse = cv2.fitEllipse(cnt)
                 (cx, cy), (minor, major), angle = ellipse
                 if minor > major:
@@ -294,19 +442,8 @@ class ShapeBasedSegmenter:
                 if not (self.min_aspect_ratio <= aspect_ratio <= self.max_aspect_ratio):
                     continue
                 
-                perimeter = cv2.arcLength(cnt, True)
-                area = cv2.contourArea(cnt)
-                circularity = 4 * np.pi * area / (perimeter ** 2)
-                if not (self.min_circularity <= circularity <= self.max_circularity):
-                    continue
-                
-                # Ellipse fit score
-                ellipse_mask = np.zeros(img.shape[:2], dtype=np.uint8)
-                cv2.ellipse(ellipse_mask, ellipse, 255, -1)
-                
-                intersection = cv2.bitwise_and(cand["mask"], ellipse_mask)
-                union = cv2.bitwise_or(cand["mask"], ellipse_mask)
-                fit_score = cv2.countNonZero(intersection) / max(1, cv2.countNonZero(union))
+                # Ellipse fit score (the only raster step) for survivors only
+                fit_score = self._ellipse_fit_score(cand, ellipse, img.shape[:2])
                 
                 if fit_score < 0.50:
                     continue
@@ -320,42 +457,61 @@ class ShapeBasedSegmenter:
                 continue
         return valid
     
-    def _select_best_fruit(self, candidates, img, shadow_mask):
+    @staticmethod
+    def _ellipse_fit_score(cand, ellipse, img_shape) -> float:
+        """
+        IoU between a candidate mask and its filled fitted ellipse, rasterised
+        only over the union of the two bounding boxes.
+        """
+        ht, wt = img_shape
+        x, y, bw, bh = cand["bbox"]
+        ex, ey, ew, eh = cv2.boundingRect(cv2.boxPoints(ellipse))
+        x0, y0 = max(0, min(x, ex)), max(0, min(y, ey))
+        x1, y1 = min(wt, max(x + bw, ex + ew)), min(ht, max(y + bh, ey + eh))
+        
+        (cx, cy), axes, angle = ellipse
+        ellipse_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        cv2.ellipse(ellipse_mask, ((cx - x0, cy - y0), axes, angle), 255, -1)
+        
+        # The candidate only has pixels inside its own bbox, so the overlap is
+        # counted there and the union follows from the two areas
+        ellipse_in_bbox = ellipse_mask[y-y0:y-y0+bh, x-x0:x-x0+bw]
+        intersection = cv2.countNonZero(cv2.bitwise_and(cand["mask"], ellipse_in_bbox))
+        union = (cv2.countNonZero(cand["mask"]) + cv2.countNonZero(ellipse_mask)
+                 - intersection)
+        return intersection / max(1, union)
+    
+    def _select_best_fruit(self, candidates, hsv, gray):
         """Select the best fruit candidate using weighted scoring."""
         if not candidates:
             return None
         
         for cand in candidates:
-            scores = []
-            
-            shape_score = cand.get("shape_score", 0.5)
-            scores.append(shape_score * 0.35)
-            
-            texture_score = self._calculate_texture_score(img, cand["mask"])
-            cand["texture_score"] = texture_score
-            scores.append(texture_score * 0.25)
-            
-            color_score = self._calculate_color_consistency(img, cand["mask"])
-            cand["color_score"] = color_score
-            scores.append(color_score * 0.10)
+            if "texture_score" in cand:  # Scored after an earlier detector
+                continue
             
-            position_score = self._calculate_position_score(cand["bbox"], img.shape[:2])
-            cand["position_score"] = position_score
-            scores.append(position_score * 0.10)
+            x, y, bw, bh = cand["bbox"]
+            gray_roi = gray[y:y+bh, x:x+bw]
+            hsv_roi = hsv[y:y+bh, x:x+bw]
             
+            cand.setdefault("shape_score", 0.5)
+            cand["texture_score"] = self._calculate_texture_score(gray_roi, cand["mask"])
+            cand["color_score"] = self._calculate_color_consistency(hsv_roi, cand["mask"])
+            cand["position_score"] = self._calculate_position_score(cand["bbox"], gray.shape[:2])
             # Talisay color match (is this green/yellow/brown?)
-            talisay_score = self._calculate_talisay_color_score(img, cand["mask"])
-            cand["talisay_color_score"] = talisay_score
-            scores.append(talisay_score * 0.20)
-            
-            cand["confidence"] = sum(scores)
+            cand["talisay_color_score"] = self._calculate_talisay_color_score(hsv_roi, cand["mask"])
+        
+        # One row of component scores per candidate -> weighted confidences
+        score_matrix = np.array([[cand[n] for n in _SCORE_NAMES] for cand in candidates])
+        confidences = score_matrix @ _SCORE_WEIGHTS
+        for cand, confidence in zip(candidates, confidences):
+            cand["confidence"] = float(confidence)
         
-        best = max(candidates, key=lambda x: x["confidence"])
+        best = candidates[int(np.argmax(confidences))]
         return best if best["confidence"] >= 0.30 else None
     
-    def _calculate_talisay_color_score(self, img, mask) -> float:
+    def _calculate_talisay_color_score(self, hsv, mask) -> float:
         """How well does the masked region match Talisay colors?"""
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         pixels = hsv[mask > 0]
         if len(pixels) < 10:
             return 0.0
@@ -367,39 +523,51 @@ class ShapeBasedSegmenter:
         
         return np.sum(green | yellow | brown) / len(pixels)
     
-    def _calculate_texture_score(self, img, mask) -> float:
+    def _calculate_texture_score(self, gray, mask) -> float:
         """Fruits are smooth."""
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        pixels = gray[mask > 0]
-        if len(pixels) < 10:
+        if cv2.countNonZero(mask) < 10:
             return 0.0
-        return max(0, 1 - np.std(pixels) / 50)
+        _, std = cv2.meanStdDev(gray, mask=mask)
+        return max(0.0, 1.0 - float(std[0, 0]) / 50.0)
     
-    def _calculate_color_consistency(self, img, mask) -> float:
-        """Fruits are uniformly colored."""
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        hue = hsv[:, :, 0][mask > 0]
-        if len(hue) < 10:
+    def _calculate_color_consistency(self, hsv, mask) -> float:
+        """
+        Fruits are uniformly colored.
+        
+        Hue is circular (red sits at both 0 and 179), so the spread is the
+        circular std from the mean resultant length of the hue angles,
+        expressed in hue units to keep the original /20 scale.
+        """
+        if cv2.countNonZero(mask) < 10:
+            return 0.0
+        hue = cv2.extractChannel(hsv, 0)
+        cos_mean = cv2.mean(cv2.LUT(hue, self._hue_cos_lut), mask=mask)[0]
+        sin_mean = cv2.mean(cv2.LUT(hue, self._hue_sin_lut), mask=mask)[0]
+        resultant = min(1.0, np.hypot(cos_mean, sin_mean))
+        if resultant <= 1e-12:
             return 0.0
-        return max(0, 1 - np.std(hue) / 20)
+        hue_std = np.sqrt(-2.0 * np.log(resultant)) * (180 / (2 * np.pi))
+        return max(0.0, 1.0 - float(hue_std) / 20.0)
     
     def _calculate_position_score(self, bbox, img_shape) -> float:
         """Fruits often near center."""
         ht, wt = img_shape
+        shape, max_dist = self._position_norm
+        if shape != (ht, wt):
+            max_dist = math.hypot(wt / 2, ht / 2)
+            self._position_norm = ((ht, wt), max_dist)
         x, y, bw, bh = bbox
-        cx, cy = x + bw / 2, y + bh / 2
-        dist = np.sqrt((cx - wt/2)**2 + (cy - ht/2)**2)
-        max_dist = np.sqrt((wt/2)**2 + (ht/2)**2)
+        dist = math.hypot(x + bw / 2 - wt / 2, y + bh / 2 - ht / 2)
         return 1 - (dist / max_dist)
     
-    def _refine_fruit_mask(self, img, mask, contour, shadow_mask, ellipse=None):
+    def _refine_fruit_mask(self, s_ch, v_ch, mask, contour, not_shadow, ellipse=None):
         """
         Refine mask by:
         1. Fitting an ellipse for clean pear/mango shape
         2. Removing ALL shadow/dark regions
         3. Smoothing edges, filling holes
         """
-        h, w = img.shape[:2]
+        h, w = mask.shape[:2]
         
         # Use fitted ellipse as primary shape (clean boundary)
         if ellipse is not None:
@@ -416,13 +584,9 @@ class ShapeBasedSegmenter:
             refined = mask.copy()
         
         # AGGRESSIVELY remove shadows
-        refined = cv2.bitwise_and(refined, cv2.bitwise_not(shadow_mask))
+        cv2.bitwise_and(refined, not_shadow, dst=refined)
         
         # Remove dark pixels inside mask
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        v_ch = hsv[:, :, 2]
-        s_ch = hsv[:, :, 1]
-        
         dark_inside = (v_ch < 35) & (refined > 0)
         refined[dark_inside] = 0
         
@@ -430,14 +594,14 @@ class ShapeBasedSegmenter:
         refined[dark_gray_inside] = 0
         
         # Fill holes, smooth edges
-        kernel_large = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
-        refined = cv2.morphologyEx(refined, cv2.MORPH_CLOSE, kernel_large)
+        refined = cv2.morphologyEx(refined, cv2.MORPH_CLOSE, self._k15)
         
-        kernel_small = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        refined = cv2.morphologyEx(refined, cv2.MORPH_OPEN, kernel_small)
+        refined = cv2.morphologyEx(refined, cv2.MORPH_OPEN, self._k5)
         
-        refined = cv2.GaussianBlur(refined, (5, 5), 0)
-        _, refined = cv2.threshold(refined, 127, 255, cv2.THRESH_BINARY)
+        # Final 3x3 open + close rounds the boundary and drops speckle while
+        # staying binary uint8 (no blur + re-threshold round trip)
+        refined = cv2.morphologyEx(refined, cv2.MORPH_OPEN, self._k3)
+        refined = cv2.morphologyEx(refined, cv2.MORPH_CLOSE, self._k3)
         
         return refined
     
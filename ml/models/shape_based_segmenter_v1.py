@@ -29,6 +29,12 @@ class ShapeBasedSegmenter:
         # Fruit should be at least 2% but not more than 70% of image
         self.min_area_ratio = 0.015  # Relaxed from 0.02
         self.max_area_ratio = 0.75   # Slightly increased from 0.70
+        
+        # Elliptical structuring elements, built once and shared by all calls
+        self._k5 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self._k7 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+        self._k11 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (11, 11))
+        self._k15 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
     
     def segment_fruit_by_shape(
         self,
@@ -122,9 +128,8 @@ class ShapeBasedSegmenter:
         shadow_mask = (dark_regions & low_sat).astype(np.uint8) * 255
         
         # Morphological operations to clean up
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_CLOSE, kernel)
-        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_OPEN, kernel)
+        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_CLOSE, self._k7)
+        shadow_mask = cv2.morphologyEx(shadow_mask, cv2.MORPH_OPEN, self._k7)
         
         return shadow_mask
     
@@ -178,8 +183,7 @@ class ShapeBasedSegmenter:
         edges = cv2.bitwise_and(edges, cv2.bitwise_not(shadow_mask))
         
         # Dilate to connect nearby edges
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        edges = cv2.dilate(edges, kernel, iterations=2)
+        edges = cv2.dilate(edges, self._k5, iterations=2)
         
         # Find contours
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -232,9 +236,8 @@ class ShapeBasedSegmenter:
         combined = cv2.bitwise_and(combined, cv2.bitwise_not(shadow_mask))
         
         # Clean up
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-        combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel)
-        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
+        combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, self._k7)
+        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, self._k7)
         
         # Find contours
         contours, _ = cv2.findContours(combined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -272,23 +275,29 @@ class ShapeBasedSegmenter:
         
         # Calculate local standard deviation (texture measure)
         # Smooth regions = low std, textured regions = high std
-        kernel_size = 15
-        mean = cv2.blur(gray, (kernel_size, kernel_size))
-        mean_sq = cv2.blur(gray ** 2, (kernel_size, kernel_size))
-        std = np.sqrt(np.abs(mean_sq - mean ** 2))
+        # (float32 throughout: squaring uint8 gray would wrap around; two
+        # buffers are reused in place for E[x^2] and E[x]^2 -> std)
+        ksize = (15, 15)
+        sq = gray.astype(np.float32)
+        std = cv2.boxFilter(sq, cv2.CV_32F, ksize)
+        cv2.multiply(sq, sq, dst=sq)
+        cv2.boxFilter(sq, cv2.CV_32F, ksize, dst=sq)
+        cv2.multiply(std, std, dst=std)
+        cv2.subtract(sq, std, dst=std)
+        cv2.max(std, 0, dst=std)
+        cv2.sqrt(std, dst=std)
         
         # Fruits are smoother (lower std)
         # Use Otsu to find threshold
-        std_norm = (std / std.max() * 255).astype(np.uint8)
+        std_norm = cv2.normalize(std, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
         _, smooth_mask = cv2.threshold(std_norm, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
         
         # Exclude shadows
         smooth_mask = cv2.bitwise_and(smooth_mask, cv2.bitwise_not(shadow_mask))
         
         # Clean up
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (11, 11))
-        smooth_mask = cv2.morphologyEx(smooth_mask, cv2.MORPH_CLOSE, kernel)
-        smooth_mask = cv2.morphologyEx(smooth_mask, cv2.MORPH_OPEN, kernel)
+        smooth_mask = cv2.morphologyEx(smooth_mask, cv2.MORPH_CLOSE, self._k11)
+        smooth_mask = cv2.morphologyEx(smooth_mask, cv2.MORPH_OPEN, self._k11)
         
         # Find contours
         contours, _ = cv2.findContours(smooth_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -527,12 +536,10 @@ class ShapeBasedSegmenter:
         refined = cv2.bitwise_and(mask, cv2.bitwise_not(shadow_mask))
         
         # Fill small holes
-        kernel_large = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
-        refined = cv2.morphologyEx(refined, cv2.MORPH_CLOSE, kernel_large)
+        refined = cv2.morphologyEx(refined, cv2.MORPH_CLOSE, self._k15)
         
         # Smooth edges
-        kernel_small = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        refined = cv2.morphologyEx(refined, cv2.MORPH_OPEN, kernel_small)
+        refined = cv2.morphologyEx(refined, cv2.MORPH_OPEN, self._k5)
         
         # Smooth with Gaussian
         refined = cv2.GaussianBlur(refined, (5, 5), 0)
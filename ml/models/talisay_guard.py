@@ -81,13 +81,156 @@ SKIN_HSV = {
     "upper": np.array([25, 170, 255]),
 }
 
+SKIN_YCRCB = {
+    "lower": np.array([80, 133, 77]),
+    "upper": np.array([255, 173, 127]),
+}
+
+
+def _u8(values) -> np.ndarray:
+    """C-contiguous uint8 bound, so comparisons against uint8 pixels and
+    cv2.inRange never need a per-call cast."""
+    return np.ascontiguousarray(values, dtype=np.uint8)
+
+
+# Non-Talisay colours rejected by Layer 4: name -> HSV ranges + label
+NON_TALISAY_COLOURS = {
+    "red_fruit": {
+        "ranges": [
+            (_u8([0, 90, 60]), _u8([10, 255, 255])),
+            (_u8([160, 90, 60]), _u8([180, 255, 255])),
+        ],
+        "label": "red fruit (apple, tomato, red pepper)",
+    },
+    "orange_fruit": {
+        "ranges": [
+            (_u8([10, 100, 100]), _u8([22, 255, 255])),
+        ],
+        "label": "orange fruit (orange, tangerine)",
+    },
+    "pink_fruit": {
+        "ranges": [
+            (_u8([140, 30, 140]), _u8([172, 160, 255])),
+        ],
+        "label": "pink/magenta fruit (dragon fruit)",
+    },
+    "purple_fruit": {
+        "ranges": [
+            (_u8([120, 40, 40]), _u8([158, 255, 255])),
+        ],
+        "label": "purple fruit (grape, mangosteen)",
+    },
+    "blue_object": {
+        "ranges": [
+            (_u8([95, 50, 50]), _u8([130, 255, 255])),
+        ],
+        "label": "blue object",
+    },
+    "bright_white_object": {
+        "ranges": [
+            (_u8([0, 0, 220]), _u8([180, 35, 255])),
+        ],
+        "label": "white/bright object (paper, screen)",
+    },
+    "very_dark_object": {
+        "ranges": [
+            (_u8([0, 0, 0]), _u8([180, 255, 20])),
+        ],
+        "label": "very dark object (dark screen)",
+    },
+}
+
 # Minimum acceptance thresholds
 MIN_GUARD_SCORE = 0.55        # Minimum composite score to accept
 MIN_POSITIVE_LAYERS = 3       # Minimum positive checks that must pass
 MIN_TALISAY_COLOUR_COV = 0.30 # 30% of fruit pixels must be Talisay colour
+DECISIVE_COLOUR_COV = 0.02    # Below this, reject before the texture layer
 MAX_SKIN_COVERAGE = 0.25      # Reject if >25% of image is skin
 MAX_CAPSICUM_SCORE = 0.45     # Reject if capsicum probability > 45%
 
+# Layers 3-6 only use coverage ratios and scale-invariant shape metrics,
+# so they run on a copy whose longest side is capped at this size; their
+# pixel-count limits and the mask clean-up kernel are given at original
+# resolution and scaled to the copy
+GUARD_WORK_MAX_DIM = 384
+
+# Slightly wider green band used only for initial fruit-mask detection
+FRUIT_MASK_WIDE_GREEN_HSV = {
+    "lower": np.array([25, 30, 30]),
+    "upper": np.array([90, 255, 255]),
+}
+
+# Store every band bound as uint8 once, at import
+for _band in (TALISAY_GREEN_HSV, TALISAY_YELLOW_HSV, TALISAY_BROWN_HSV,
+              SILING_GREEN_HSV, SILING_RED_HSV_1, SILING_RED_HSV_2,
+              SKIN_HSV, SKIN_YCRCB, FRUIT_MASK_WIDE_GREEN_HSV):
+    _band["lower"] = _u8(_band["lower"])
+    _band["upper"] = _u8(_band["upper"])
+del _band
+
+
+def _build_band_lut(bands: List[Dict]) -> np.ndarray:
+    """
+    Build a per-channel cv2.LUT table for a union of HSV boxes.
+
+    Bit i of entry [v, 0, c] is set when value v lies inside band i on
+    channel c, so a pixel is inside some band exactly when the AND of its
+    three looked-up bytes is non-zero. Supports up to 8 bands.
+    """
+    lut = np.zeros((256, 1, 3), dtype=np.uint8)
+    values = np.arange(256)
+    for bit, band in enumerate(bands):
+        for c in range(3):
+            inside = (values >= band["lower"][c]) & (values <= band["upper"][c])
+            lut[inside, 0, c] |= np.uint8(1 << bit)
+    return lut
+
+
+def _score_talisay_shape(aspect: float, circularity: float, solidity: float,
+                         aspect_range: Tuple[float, float],
+                         circularity_range: Tuple[float, float],
+                         min_solidity: float) -> Tuple[float, bool]:
+    """
+    Score almond-drupe shape features (pure scalar logic, no OpenCV).
+
+    Returns:
+        (score, passes) where score is in 0.0-1.0
+    """
+    score = 0.0
+
+    # Aspect ratio score (peak around 1.5-2.0)
+    ar_min, ar_max = aspect_range
+    if ar_min <= aspect <= ar_max:
+        # Peak score at the middle of the range
+        mid = (ar_min + ar_max) / 2
+        ar_score = 1.0 - abs(aspect - mid) / ((ar_max - ar_min) / 2)
+        score += ar_score * 0.40
+    elif 1.1 <= aspect <= 2.6:
+        # Partially OK
+        score += 0.15
+    # else: too round or too elongated → 0
+
+    # Circularity score
+    c_min, c_max = circularity_range
+    if c_min <= circularity <= c_max:
+        score += 0.30
+    elif 0.25 <= circularity <= 0.85:
+        score += 0.12
+
+    # Solidity score
+    if solidity >= min_solidity:
+        score += 0.30
+    elif solidity >= 0.72:
+        score += 0.12
+
+    passes = (
+        score >= 0.50 and
+        aspect >= 1.1 and  # Must not be perfectly round
+        aspect <= 3.0 and  # Must not be chili-thin
+        circularity <= 0.90  # Must not be coin-round
+    )
+    return score, passes
+
 
 class TalisayGuard:
     """
@@ -117,6 +260,16 @@ class TalisayGuard:
         self._capsicum_aspect_range = (2.5, 8.0)   # Very elongated
         self._capsicum_circularity_range = (0.10, 0.50)
 
+        # Rectangular SE for fruit-mask clean-up at original resolution
+        # (OpenCV runs it separably); see _mask_kernel_for for work copies
+        self._mask_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
+
+        # Single-pass membership table for all fruit-mask colour bands
+        self._fruit_band_lut = _build_band_lut([
+            TALISAY_GREEN_HSV, TALISAY_YELLOW_HSV, TALISAY_BROWN_HSV,
+            FRUIT_MASK_WIDE_GREEN_HSV,
+        ])
+
         # Haar cascade for face detection (ships with OpenCV)
         self._face_cascade = None
         try:
@@ -185,10 +338,20 @@ class TalisayGuard:
         # ════════════════════════════════════════════
         # Build fruit mask if not provided
         # ════════════════════════════════════════════
+        work_img, scale = self._downscale_for_stats(image)
+        work_h, work_w = work_img.shape[:2]
         if fruit_mask is None:
-            fruit_mask = self._build_fruit_mask(image, yolo_fruit_info)
+            work_mask = self._build_fruit_mask(
+                work_img, self._scale_bbox_info(yolo_fruit_info, scale), scale
+            )
+        elif scale < 1.0:
+            work_mask = cv2.resize(fruit_mask, (work_w, work_h),
+                                   interpolation=cv2.INTER_NEAREST)
+        else:
+            work_mask = fruit_mask
 
-        fruit_area = np.sum(fruit_mask > 0)
+        # Area in original-resolution pixels
+        fruit_area = np.count_nonzero(work_mask) / (scale * scale)
         if fruit_area < 500:
             return self._make_verdict(
                 False, GuardVerdict.REJECT_GENERIC, 0.0, layers,
@@ -199,7 +362,7 @@ class TalisayGuard:
         # ════════════════════════════════════════════
         # LAYER 3: Capsicum / Siling detection
         # ════════════════════════════════════════════
-        capsicum_result = self._check_capsicum(image, fruit_mask)
+        capsicum_result = self._check_capsicum(work_img, work_mask, scale)
         layers["capsicum"] = capsicum_result
         if capsicum_result["is_capsicum"]:
             return self._make_verdict(
@@ -212,7 +375,9 @@ class TalisayGuard:
         # ════════════════════════════════════════════
         # LAYER 4: Non-Talisay fruit colour rejection
         # ════════════════════════════════════════════
-        non_talisay_result = self._check_non_talisay_colours(image, fruit_mask)
+        non_talisay_result = self._check_non_talisay_colours(
+            work_img, work_mask, scale
+        )
         layers["non_talisay_colour"] = non_talisay_result
         if non_talisay_result["is_non_talisay"]:
             return self._make_verdict(
@@ -225,13 +390,13 @@ class TalisayGuard:
         # ════════════════════════════════════════════
         # LAYER 5: Talisay colour histogram match
         # ════════════════════════════════════════════
-        colour_result = self._check_talisay_colour(image, fruit_mask)
+        colour_result = self._check_talisay_colour(work_img, work_mask, scale)
         layers["talisay_colour"] = colour_result
 
         # ════════════════════════════════════════════
         # LAYER 6: Talisay shape verification
         # ════════════════════════════════════════════
-        shape_result = self._check_talisay_shape(fruit_mask)
+        shape_result = self._check_talisay_shape(work_mask, scale)
         layers["talisay_shape"] = shape_result
 
         # SHAPE QUALITY GATE: Without YOLO, our colour-based mask
@@ -239,7 +404,6 @@ class TalisayGuard:
         # ratio unreliable. We only hard-reject on shape when the mask
         # is very compact (likely represents a single object AND is very
         # clearly wrong (near-circular like a coin with high circularity).
-        h_img, w_img = image.shape[:2]
         mask_coverage = fruit_area / (h_img * w_img)
         aspect = shape_result.get("aspect_ratio", 1.0)
         circ = shape_result.get("circularity", 1.0)
@@ -255,9 +419,26 @@ class TalisayGuard:
                 "round objects."
             )
 
+        # Almost no Talisay colour on the fruit is a decisive colour
+        # reject; skip the full-resolution Laplacian texture pass
+        if colour_result.get("coverage", 0.0) < DECISIVE_COLOUR_COV:
+            return self._make_verdict(
+                False, GuardVerdict.REJECT_WRONG_COLOUR,
+                colour_result.get("score", 0) * 0.45, layers,
+                "🎨 The colours in this image don't match Talisay fruit. "
+                "Talisay fruits are green (immature), yellow (mature), or "
+                "brown (ripe) with specific colour profiles."
+            )
+
         # ════════════════════════════════════════════
         # LAYER 7: Surface texture verification
         # ════════════════════════════════════════════
+        # Laplacian variance depends on resolution (its thresholds were set
+        # at full size), so texture runs on the original image
+        if fruit_mask is None:
+            fruit_mask = work_mask if scale == 1.0 else cv2.resize(
+                work_mask, (w_img, h_img), interpolation=cv2.INTER_NEAREST
+            )
         texture_result = self._check_talisay_texture(image, fruit_mask)
         layers["talisay_texture"] = texture_result
 
@@ -305,7 +486,7 @@ class TalisayGuard:
                 # Check whether the green/yellow pixels supporting rescue
                 # are vegetation (high saturation) rather than Talisay fruit.
                 # Vegetation green: median S > 140.  Talisay fruit: S ≈ 50-120.
-                hsv_veg = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+                hsv_veg = cv2.cvtColor(work_img, cv2.COLOR_BGR2HSV)
                 veg_green_mask = cv2.inRange(
                     hsv_veg, TALISAY_GREEN_HSV["lower"],
                     TALISAY_GREEN_HSV["upper"]
@@ -346,6 +527,66 @@ class TalisayGuard:
                     "(Terminalia catappa) fruit with good lighting."
                 )
 
+    def verify_fast(
+        self,
+        image: np.ndarray,
+        yolo_fruit_info: Dict,
+    ) -> Optional[Dict]:
+        """
+        Cheap verification for a fruit YOLO has already localised.
+
+        A confident YOLO fruit box rules out blank images and people, so
+        only the colour and shape layers (3-6) run, on the box crop instead
+        of the whole frame, and the full-resolution texture layer is
+        skipped (YOLO's detection stands in as the third positive layer).
+
+        Returns an ACCEPT verdict when no reject layer fires and both the
+        colour and shape layers pass, otherwise None: the result is then
+        inconclusive and the caller should fall back to verify().
+        """
+        bbox = yolo_fruit_info.get("bbox") if yolo_fruit_info else None
+        if not bbox:
+            return None
+
+        h_img, w_img = image.shape[:2]
+        x1, y1, x2, y2 = [int(v) for v in bbox]
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w_img, x2), min(h_img, y2)
+        if x2 - x1 < 16 or y2 - y1 < 16:
+            return None
+
+        work_img, scale = self._downscale_for_stats(image[y1:y2, x1:x2])
+        work_mask = self._build_fruit_mask(work_img, None, scale)
+        if np.count_nonzero(work_mask) < 200 * scale * scale:
+            return None
+
+        layers = {}
+        layers["capsicum"] = self._check_capsicum(work_img, work_mask, scale)
+        if layers["capsicum"]["is_capsicum"]:
+            return None
+        layers["non_talisay_colour"] = self._check_non_talisay_colours(
+            work_img, work_mask, scale
+        )
+        if layers["non_talisay_colour"]["is_non_talisay"]:
+            return None
+
+        colour_result = self._check_talisay_colour(work_img, work_mask, scale)
+        shape_result = self._check_talisay_shape(work_mask, scale)
+        layers["talisay_colour"] = colour_result
+        layers["talisay_shape"] = shape_result
+        if not (colour_result.get("passes") and shape_result.get("passes")):
+            return None
+
+        composite = (
+            colour_result.get("score", 0) * 0.45 +
+            shape_result.get("score", 0) * 0.30 +
+            yolo_fruit_info.get("confidence", 0) * 0.25
+        )
+        return self._make_verdict(
+            True, GuardVerdict.ACCEPT, composite, layers,
+            "✅ Talisay fruit verified successfully."
+        )
+
     # ───────────────────────────────────────────────────
     # LAYER 1: Blank / featureless image
     # ───────────────────────────────────────────────────
@@ -370,7 +611,7 @@ class TalisayGuard:
 
         # Check edge density
         edges = cv2.Canny(gray, 50, 150)
-        edge_ratio = np.sum(edges > 0) / (h * w)
+        edge_ratio = cv2.countNonZero(edges) / (h * w)
         if edge_ratio < 0.005:  # Almost no edges
             return {"is_blank": True, "reason": "no_edges",
                     "edge_ratio": float(edge_ratio)}
@@ -378,7 +619,7 @@ class TalisayGuard:
         # Check if one colour dominates >90%
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         # Very low saturation + uniform value = blank screen
-        low_sat = np.sum(hsv[:, :, 1] < 15) / (h * w)
+        low_sat = np.count_nonzero(hsv[:, :, 1] < 15) / (h * w)
         if low_sat > 0.90:
             value_var = np.var(hsv[:, :, 2])
             if value_var < 300:
@@ -413,10 +654,9 @@ class TalisayGuard:
         # Build skin mask (combined HSV + YCrCb for precision)
         skin_hsv_mask = cv2.inRange(hsv, SKIN_HSV["lower"], SKIN_HSV["upper"])
         skin_ycrcb_mask = cv2.inRange(ycrcb,
-                                       np.array([80, 133, 77]),
-                                       np.array([255, 173, 127]))
+                                       SKIN_YCRCB["lower"], SKIN_YCRCB["upper"])
         combined_skin = cv2.bitwise_and(skin_hsv_mask, skin_ycrcb_mask)
-        skin_coverage = np.sum(combined_skin > 0) / total
+        skin_coverage = cv2.countNonZero(combined_skin) / total
 
         # Build Talisay colour mask for rescue logic.
         # CRITICAL: For rescue (overriding skin rejection), we use TWO tiers:
@@ -430,7 +670,7 @@ class TalisayGuard:
             TALISAY_YELLOW_HSV["lower"], TALISAY_YELLOW_HSV["upper"])
         # Strong rescue: green + yellow (definitively not skin)
         strong_rescue = talisay_green | talisay_yellow
-        strong_rescue_cov = np.sum(strong_rescue > 0) / total
+        strong_rescue_cov = cv2.countNonZero(strong_rescue) / total
 
         # Weak rescue: include brown non-skin too
         talisay_brown_raw = cv2.inRange(hsv,
@@ -440,7 +680,7 @@ class TalisayGuard:
             cv2.bitwise_not(combined_skin)
         )
         total_rescue = strong_rescue | talisay_brown_nonskin
-        total_rescue_cov = np.sum(total_rescue > 0) / total
+        total_rescue_cov = cv2.countNonZero(total_rescue) / total
 
         # --- Face detection ---
         faces_found = 0
@@ -495,10 +735,12 @@ class TalisayGuard:
     # LAYER 3: Capsicum / Siling / Chili detection
     # ───────────────────────────────────────────────────
 
-    def _check_capsicum(self, image: np.ndarray, mask: np.ndarray) -> Dict:
+    def _check_capsicum(self, image: np.ndarray, mask: np.ndarray,
+                        scale: float = 1.0) -> Dict:
         """
         Detect Capsicum frutescens (Siling Labuyo, Siling Haba) and
-        other chili peppers.
+        other chili peppers. `scale` is image size relative to the
+        original photo (pixel-count limits are scaled by its square).
 
         Key discriminators vs Talisay:
         1. SHAPE: Peppers are much more elongated (aspect ratio > 2.5)
@@ -510,7 +752,8 @@ class TalisayGuard:
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         fruit_pixels = hsv[mask > 0]
 
-        if len(fruit_pixels) < 200:
+        area_scale = scale * scale
+        if len(fruit_pixels) < 200 * area_scale:
             return {"is_capsicum": False, "score": 0.0}
 
         total_px = len(fruit_pixels)
@@ -532,9 +775,9 @@ class TalisayGuard:
             (fruit_pixels <= SILING_RED_HSV_2["upper"]),
             axis=1
         )
-        siling_colour_cov = (np.sum(green_siling) +
-                             np.sum(red_siling_1) +
-                             np.sum(red_siling_2)) / total_px
+        siling_colour_cov = (np.count_nonzero(green_siling) +
+                             np.count_nonzero(red_siling_1) +
+                             np.count_nonzero(red_siling_2)) / total_px
         has_siling_colour = siling_colour_cov > 0.30
         if has_siling_colour:
             capsicum_score += 0.20
@@ -546,11 +789,10 @@ class TalisayGuard:
         if not contours:
             return {"is_capsicum": False, "score": 0.0}
 
-        largest = max(contours, key=cv2.contourArea)
-        area = cv2.contourArea(largest)
+        largest, area = self._largest_contour(contours)
         perimeter = cv2.arcLength(largest, True)
 
-        if area < 100 or perimeter == 0:
+        if area < 100 * area_scale or perimeter == 0:
             return {"is_capsicum": False, "score": 0.0}
 
         # Fit ellipse for aspect ratio
@@ -614,74 +856,30 @@ class TalisayGuard:
     # ───────────────────────────────────────────────────
 
     def _check_non_talisay_colours(self, image: np.ndarray,
-                                    mask: np.ndarray) -> Dict:
+                                    mask: np.ndarray,
+                                    scale: float = 1.0) -> Dict:
         """
         Detect non-Talisay items by colour.
         Expanded from base validator to include more categories.
         """
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         pixels = hsv[mask > 0]
-        if len(pixels) < 100:
+        if len(pixels) < 100 * scale * scale:
             return {"is_non_talisay": False, "detected_type": None}
 
         total = len(pixels)
 
-        reject_colours = {
-            "red_fruit": {
-                "ranges": [
-                    (np.array([0, 90, 60]), np.array([10, 255, 255])),
-                    (np.array([160, 90, 60]), np.array([180, 255, 255])),
-                ],
-                "label": "red fruit (apple, tomato, red pepper)",
-            },
-            "orange_fruit": {
-                "ranges": [
-                    (np.array([10, 100, 100]), np.array([22, 255, 255])),
-                ],
-                "label": "orange fruit (orange, tangerine)",
-            },
-            "pink_fruit": {
-                "ranges": [
-                    (np.array([140, 30, 140]), np.array([172, 160, 255])),
-                ],
-                "label": "pink/magenta fruit (dragon fruit)",
-            },
-            "purple_fruit": {
-                "ranges": [
-                    (np.array([120, 40, 40]), np.array([158, 255, 255])),
-                ],
-                "label": "purple fruit (grape, mangosteen)",
-            },
-            "blue_object": {
-                "ranges": [
-                    (np.array([95, 50, 50]), np.array([130, 255, 255])),
-                ],
-                "label": "blue object",
-            },
-            "bright_white_object": {
-                "ranges": [
-                    (np.array([0, 0, 220]), np.array([180, 35, 255])),
-                ],
-                "label": "white/bright object (paper, screen)",
-            },
-            "very_dark_object": {
-                "ranges": [
-                    (np.array([0, 0, 0]), np.array([180, 255, 20])),
-                ],
-                "label": "very dark object (dark screen)",
-            },
-        }
 
         max_cov = 0.0
         detected = None
 
-        for name, info in reject_colours.items():
+        for name, info in NON_TALISAY_COLOURS.items():
             count = 0
             for lower, upper in info["ranges"]:
                 match = np.all(
                     (pixels >= lower) & (pixels <= upper), axis=1
                 )
-                count += np.sum(match)
+                count += np.count_nonzero(match)
             cov = count / total
             if cov > max_cov:
                 max_cov = cov
@@ -701,7 +899,7 @@ class TalisayGuard:
                     (pixels >= band["lower"]) & (pixels <= band["upper"]),
                     axis=1
                 )
-                talisay_count += np.sum(m)
+                talisay_count += np.count_nonzero(m)
             talisay_cov = talisay_count / total
             # If there's meaningful Talisay colour (>12%), don't reject
             if talisay_cov > 0.12:
@@ -718,7 +916,8 @@ class TalisayGuard:
     # ───────────────────────────────────────────────────
 
     def _check_talisay_colour(self, image: np.ndarray,
-                               mask: np.ndarray) -> Dict:
+                               mask: np.ndarray,
+                               scale: float = 1.0) -> Dict:
         """
         Verify that the fruit region has a colour profile that matches
         Talisay (green, yellow, or brown in specific HSV bands).
@@ -728,34 +927,27 @@ class TalisayGuard:
         coverage of Talisay-specific colour signatures.
         """
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        pixels = hsv[mask > 0]
 
-        if len(pixels) < 200:
-            return {"passes": False, "score": 0.0, "coverage": 0.0}
-
-        total = len(pixels)
+        # Bits 0-2 of the fruit-band LUT are the strict green/yellow/brown
+        # bands, so each fruit pixel maps to a 3-bit band code (0-7)
+        band_bits = cv2.LUT(hsv, self._fruit_band_lut)
+        h_bits, s_bits, v_bits = cv2.split(band_bits)
+        cv2.bitwise_and(h_bits, s_bits, dst=h_bits)
+        cv2.bitwise_and(h_bits, v_bits, dst=h_bits)
+        codes = h_bits[mask > 0] & 0b111
 
-        # Count pixels in each strict Talisay band
-        green_match = np.all(
-            (pixels >= TALISAY_GREEN_HSV["lower"]) &
-            (pixels <= TALISAY_GREEN_HSV["upper"]), axis=1
-        )
-        yellow_match = np.all(
-            (pixels >= TALISAY_YELLOW_HSV["lower"]) &
-            (pixels <= TALISAY_YELLOW_HSV["upper"]), axis=1
-        )
-        brown_match = np.all(
-            (pixels >= TALISAY_BROWN_HSV["lower"]) &
-            (pixels <= TALISAY_BROWN_HSV["upper"]), axis=1
-        )
+        total = codes.size
+        if total < 200 * scale * scale:
+            return {"passes": False, "score": 0.0, "coverage": 0.0}
 
-        g_cov = np.sum(green_match) / total
-        y_cov = np.sum(yellow_match) / total
-        b_cov = np.sum(brown_match) / total
+        # One histogram over the 8 codes replaces three per-pixel range tests
+        code_counts = np.bincount(codes, minlength=8)
+        g_cov = int(code_counts[1::2].sum()) / total
+        y_cov = int(code_counts[[2, 3, 6, 7]].sum()) / total
+        b_cov = int(code_counts[4:].sum()) / total
 
         # Total Talisay coverage (union, but these ranges don't overlap much)
-        talisay_any = green_match | yellow_match | brown_match
-        total_cov = np.sum(talisay_any) / total
+        total_cov = (total - int(code_counts[0])) / total
 
         # Determine dominant Talisay colour
         coverages = {"green": g_cov, "yellow": y_cov, "brown": b_cov}
@@ -790,7 +982,8 @@ class TalisayGuard:
     # LAYER 6: Talisay shape verification
     # ───────────────────────────────────────────────────
 
-    def _check_talisay_shape(self, mask: np.ndarray) -> Dict:
+    def _check_talisay_shape(self, mask: np.ndarray,
+                             scale: float = 1.0) -> Dict:
         """
         Verify the shape matches Talisay (almond-shaped drupe).
 
@@ -806,62 +999,29 @@ class TalisayGuard:
         if not contours:
             return {"passes": False, "score": 0.0}
 
-        largest = max(contours, key=cv2.contourArea)
-        area = cv2.contourArea(largest)
+        largest, area = self._largest_contour(contours)
         perimeter = cv2.arcLength(largest, True)
 
-        if area < 300 or perimeter == 0:
+        if area < 300 * scale * scale or perimeter == 0:
             return {"passes": False, "score": 0.0}
 
         circularity = 4 * np.pi * area / (perimeter ** 2)
 
-        # Compute aspect ratio
-        if len(largest) >= 5:
-            ellipse = cv2.fitEllipse(largest)
-            (_, (minor, major), _) = ellipse
-            aspect = major / minor if minor > 0 else 1.0
-        else:
-            x, y, w, h = cv2.boundingRect(largest)
-            aspect = max(w, h) / max(min(w, h), 1)
+        # Aspect ratio from the rotated bounding box: no SVD, and stable
+        # on short contours where an ellipse fit is not
+        (_, (w, h), _) = cv2.minAreaRect(largest)
+        aspect = max(w, h) / max(min(w, h), 1)
 
         # Solidity (area / convex hull area)
         hull = cv2.convexHull(largest)
         hull_area = cv2.contourArea(hull)
         solidity = area / hull_area if hull_area > 0 else 0
 
-        # Score each feature
-        score = 0.0
-
-        # Aspect ratio score (peak around 1.5-2.0)
-        ar_min, ar_max = self._talisay_aspect_range
-        if ar_min <= aspect <= ar_max:
-            # Peak score at the middle of the range
-            mid = (ar_min + ar_max) / 2
-            ar_score = 1.0 - abs(aspect - mid) / ((ar_max - ar_min) / 2)
-            score += ar_score * 0.40
-        elif 1.1 <= aspect <= 2.6:
-            # Partially OK
-            score += 0.15
-        # else: too round or too elongated → 0
-
-        # Circularity score
-        c_min, c_max = self._talisay_circularity_range
-        if c_min <= circularity <= c_max:
-            score += 0.30
-        elif 0.25 <= circularity <= 0.85:
-            score += 0.12
-
-        # Solidity score
-        if solidity >= self._talisay_solidity_range[0]:
-            score += 0.30
-        elif solidity >= 0.72:
-            score += 0.12
-
-        passes = (
-            score >= 0.50 and
-            aspect >= 1.1 and  # Must not be perfectly round
-            aspect <= 3.0 and  # Must not be chili-thin
-            circularity <= 0.90  # Must not be coin-round
+        score, passes = _score_talisay_shape(
+            aspect, circularity, solidity,
+            self._talisay_aspect_range,
+            self._talisay_circularity_range,
+            self._talisay_solidity_range[0],
         )
 
         return {
@@ -888,6 +1048,17 @@ class TalisayGuard:
         - Has colour variation but in a smooth gradient pattern
         - May have dark spots (but not dominating)
         """
+        # Work on the mask's bounding box only (padded by one pixel so the
+        # 3x3 Laplacian sees the same neighbours as on the full image)
+        x, y, w, h = cv2.boundingRect(mask)
+        if w == 0 or h == 0:
+            return {"passes": False, "score": 0.0}
+        img_h, img_w = mask.shape[:2]
+        x0, y0 = max(x - 1, 0), max(y - 1, 0)
+        x1, y1 = min(x + w + 1, img_w), min(y + h + 1, img_h)
+        image = image[y0:y1, x0:x1]
+        mask = mask[y0:y1, x0:x1]
+
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         pixels = gray[mask > 0]
 
@@ -910,7 +1081,7 @@ class TalisayGuard:
         # Check for metallic shine (low saturation + high value sparkle)
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         fruit_hsv = hsv[mask > 0]
-        low_sat_high_val = np.sum(
+        low_sat_high_val = np.count_nonzero(
             (fruit_hsv[:, 1] < 40) & (fruit_hsv[:, 2] > 180)
         ) / len(fruit_hsv)
 
@@ -920,8 +1091,8 @@ class TalisayGuard:
             score += 0.10
 
         # Check colour homogeneity in H channel (Talisay has gradual colour)
-        hue_vals = fruit_hsv[:, 0]
-        hue_std = np.std(hue_vals)
+        _, hue_std = cv2.meanStdDev(cv2.extractChannel(hsv, 0), mask=mask)
+        hue_std = float(hue_std[0, 0])
 
         # Talisay: hue should be relatively consistent (std < 25)
         # compared to complex multi-coloured objects
@@ -932,11 +1103,9 @@ class TalisayGuard:
 
         # Local Binary Pattern-like roughness estimate
         # (simplified: Laplacian variance as texture measure)
-        fruit_region = image.copy()
-        fruit_region[mask == 0] = 0
-        lap = cv2.Laplacian(gray, cv2.CV_64F)
-        lap_vals = lap[mask > 0]
-        lap_var = np.var(lap_vals) if len(lap_vals) > 0 else 0
+        lap = cv2.Laplacian(gray, cv2.CV_16S)
+        _, lap_std = cv2.meanStdDev(lap, mask=mask)
+        lap_var = float(lap_std[0, 0]) ** 2
 
         # Talisay: moderate laplacian (not too smooth, not too rough)
         if 50 < lap_var < 3000:
@@ -961,13 +1130,17 @@ class TalisayGuard:
     # ───────────────────────────────────────────────────
 
     def _build_fruit_mask(self, image: np.ndarray,
-                           yolo_fruit_info: Optional[Dict]) -> np.ndarray:
-        """Build a fruit mask from YOLO bbox or colour segmentation."""
+                           yolo_fruit_info: Optional[Dict],
+                           scale: float = 1.0) -> np.ndarray:
+        """
+        Build a fruit mask from YOLO bbox or colour segmentation.
+        `scale` is image size relative to the original photo.
+        """
         h, w = image.shape[:2]
-        mask = np.zeros((h, w), dtype=np.uint8)
 
         # Use YOLO bounding box if available
         if yolo_fruit_info and yolo_fruit_info.get("bbox"):
+            mask = np.zeros((h, w), dtype=np.uint8)
             bbox = yolo_fruit_info["bbox"]
             x1, y1, x2, y2 = [int(v) for v in bbox]
             x1, y1 = max(0, x1), max(0, y1)
@@ -976,20 +1149,17 @@ class TalisayGuard:
             return mask
 
         # Fallback: colour-based segmentation of likely Talisay regions
+        # (strict green/yellow/brown bands plus a slightly wider green
+        # range), evaluated in one LUT pass instead of one inRange per band
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-
-        for band in [TALISAY_GREEN_HSV, TALISAY_YELLOW_HSV, TALISAY_BROWN_HSV]:
-            m = cv2.inRange(hsv, band["lower"], band["upper"])
-            mask = cv2.bitwise_or(mask, m)
-
-        # Also include some slightly wider range for initial detection
-        wider_green = cv2.inRange(hsv,
-                                   np.array([25, 30, 30]),
-                                   np.array([90, 255, 255]))
-        mask = cv2.bitwise_or(mask, wider_green)
+        band_bits = cv2.LUT(hsv, self._fruit_band_lut)
+        h_bits, s_bits, v_bits = cv2.split(band_bits)
+        cv2.bitwise_and(h_bits, s_bits, dst=h_bits)
+        cv2.bitwise_and(h_bits, v_bits, dst=h_bits)
+        mask = cv2.compare(h_bits, 0, cv2.CMP_GT)
 
         # Clean up
-        kernel = np.ones((9, 9), np.uint8)
+        kernel = self._mask_kernel_for(scale)
         mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
         mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
 
@@ -1007,6 +1177,41 @@ class TalisayGuard:
 
         return mask
 
+    def _mask_kernel_for(self, scale: float) -> np.ndarray:
+        """The 9x9 clean-up kernel resized for an image at `scale`."""
+        if scale >= 1.0:
+            return self._mask_kernel
+        size = max(3, int(round(9 * scale)) | 1)
+        return cv2.getStructuringElement(cv2.MORPH_RECT, (size, size))
+
+    @staticmethod
+    def _largest_contour(contours) -> Tuple[np.ndarray, float]:
+        """Return (largest contour, its area), computing each area once."""
+        areas = np.fromiter((cv2.contourArea(c) for c in contours),
+                            dtype=np.float64, count=len(contours))
+        idx = int(areas.argmax())
+        return contours[idx], float(areas[idx])
+
+    @staticmethod
+    def _downscale_for_stats(image: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Shrink image so its longest side is at most GUARD_WORK_MAX_DIM."""
+        h, w = image.shape[:2]
+        scale = GUARD_WORK_MAX_DIM / max(h, w)
+        if scale >= 1.0:
+            return image, 1.0
+        small = cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+        return small, scale
+
+    @staticmethod
+    def _scale_bbox_info(info: Optional[Dict], scale: float) -> Optional[Dict]:
+        """Return a copy of a detection dict with its bbox scaled."""
+        if not info or not info.get("bbox") or scale == 1.0:
+            return info
+        scaled = dict(info)
+        scaled["bbox"] = [v * scale for v in info["bbox"]]
+        return scaled
+
     @staticmethod
     def _make_verdict(accepted: bool, verdict: GuardVerdict,
                       score: float, layers: Dict,
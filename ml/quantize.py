@@ -0,0 +1,247 @@
+"""
+Convert trained Keras classifiers to full-integer (INT8) TFLite models.
+Run this ONCE after training; the classifiers pick up the .tflite file
+automatically on their next start.
+
+Post-training quantization uses a representative dataset of real fruit
+photos (data/training/existing_datasets/<color>/) to calibrate activation
+ranges. Inputs are uint8 RGB pixels, so the runtime can feed resized
+images directly without the /255 normalisation step.
+
+The MobileNetV2 colour model can also be exported to ONNX (--format onnx)
+for ONNX Runtime; that export takes NCHW float input. --format onnx-int8
+additionally quantizes it statically (QDQ, per-channel INT8 weights,
+calibrated on the same images), keeping the float input.
+
+Usage:
+    python quantize.py cnn
+    python quantize.py mobilenet
+    python quantize.py mobilenet --format onnx
+    python quantize.py mobilenet --format onnx-int8
+    python quantize.py cnn --samples 200 --calibration-dir path/to/images
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config import MODELS_DIR, TRAINING_DATA_DIR, IMAGE_SIZE
+from models.cnn_color_classifier import CNN_MODEL_PATH, CNN_TFLITE_PATH
+from predict import dl_onnx_path, dl_tflite_path
+
+MOBILENET_MODEL_PATH = MODELS_DIR / "color_classifier_mobile_best.keras"
+
+CALIBRATION_DIR = TRAINING_DATA_DIR / "existing_datasets"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+# Conversion targets: name -> (Keras source, TFLite destination)
+TARGETS = {
+    "cnn": (CNN_MODEL_PATH, CNN_TFLITE_PATH),
+    "mobilenet": (MOBILENET_MODEL_PATH, dl_tflite_path(MOBILENET_MODEL_PATH)),
+}
+# ONNX targets (only TalisayPredictor's DL classifier runs ONNX models)
+ONNX_TARGETS = {
+    "mobilenet": (MOBILENET_MODEL_PATH, dl_onnx_path(MOBILENET_MODEL_PATH)),
+}
+ONNX_INT8_TARGETS = {
+    "mobilenet": (MOBILENET_MODEL_PATH,
+                  dl_onnx_path(MOBILENET_MODEL_PATH, int8=True)),
+}
+FORMAT_TARGETS = {
+    "tflite": TARGETS,
+    "onnx": ONNX_TARGETS,
+    "onnx-int8": ONNX_INT8_TARGETS,
+}
+
+
+def collect_calibration_images(calibration_dir: Path, samples: int,
+                               seed: int = 42):
+    """Pick up to `samples` images, spread evenly over class subfolders."""
+    class_dirs = [d for d in sorted(calibration_dir.iterdir()) if d.is_dir()]
+    if not class_dirs:
+        class_dirs = [calibration_dir]
+
+    rng = random.Random(seed)
+    per_class = max(1, samples // len(class_dirs))
+    picked = []
+    for class_dir in class_dirs:
+        files = sorted(
+            p for p in class_dir.rglob("*")
+            if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        rng.shuffle(files)
+        picked.extend(files[:per_class])
+    return picked[:samples]
+
+
+def representative_dataset(image_paths, input_size=IMAGE_SIZE):
+    """Yield calibration batches preprocessed exactly like inference."""
+    def gen():
+        for path in image_paths:
+            img = cv2.imread(str(path))
+            if img is None:
+                continue
+            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            resized = cv2.resize(rgb, input_size)
+            yield [resized[np.newaxis].astype(np.float32) / 255.0]
+    return gen
+
+
+def quantize_keras_model(keras_path: Path, output_path: Path, image_paths,
+                         input_size=IMAGE_SIZE) -> Path:
+    """
+    Convert a Keras model to an INT8 TFLite model with uint8 input/output.
+
+    Returns:
+        Path to the written .tflite file
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(str(keras_path))
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(
+        image_paths, input_size
+    )
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+
+    tflite_model = converter.convert()
+    output_path.write_bytes(tflite_model)
+    return output_path
+
+
+def export_keras_onnx(keras_path: Path, output_path: Path,
+                      input_size=IMAGE_SIZE, opset: int = 15) -> Path:
+    """
+    Convert a Keras model to ONNX with an NCHW float32 input (batch dynamic).
+
+    Channels-first input lets ONNX Runtime drop the layout transposes
+    tf2onnx would otherwise keep around the convolutions. Needs
+    `pip install tf2onnx`.
+
+    Returns:
+        Path to the written .onnx file
+    """
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(str(keras_path))
+    spec = (tf.TensorSpec((None, *input_size, 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(
+        model,
+        input_signature=spec,
+        opset=opset,
+        inputs_as_nchw=["input"],
+        output_path=str(output_path),
+    )
+    return output_path
+
+
+def quantize_onnx_model(fp32_path: Path, output_path: Path, image_paths,
+                        input_size=IMAGE_SIZE) -> Path:
+    """
+    Statically quantize an NCHW ONNX classifier to INT8 (QDQ format).
+
+    Weights are per-channel INT8 and activations UINT8, with ranges
+    calibrated on `image_paths` preprocessed exactly like inference. The
+    model keeps its float input, so the runtime feeds it unchanged.
+
+    Returns:
+        Path to the written .onnx file
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    )
+
+    input_name = ort.InferenceSession(
+        str(fp32_path), providers=["CPUExecutionProvider"]
+    ).get_inputs()[0].name
+
+    class _CalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._batches = (
+                {input_name: np.ascontiguousarray(batch.transpose(0, 3, 1, 2))}
+                for (batch,) in representative_dataset(image_paths, input_size)()
+            )
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    quantize_static(
+        str(fp32_path),
+        str(output_path),
+        _CalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Quantize Talisay classifiers to INT8 TFLite (or export ONNX)"
+    )
+    parser.add_argument("target", choices=sorted(TARGETS),
+                        help="Which model to convert")
+    parser.add_argument("--format", choices=sorted(FORMAT_TARGETS), default="tflite",
+                        help="INT8 TFLite (default), or FP32 / INT8 ONNX for ONNX Runtime")
+    parser.add_argument("--samples", type=int, default=100,
+                        help="Number of calibration images (default: 100)")
+    parser.add_argument("--calibration-dir", type=Path, default=CALIBRATION_DIR,
+                        help="Folder of calibration images (subfolder per class)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Override the output .tflite / .onnx path")
+    args = parser.parse_args()
+
+    targets = FORMAT_TARGETS[args.format]
+    if args.target not in targets:
+        print(f"❌ No {args.format} export for: {args.target}")
+        return 1
+    keras_path, output_path = targets[args.target]
+    output_path = args.output or output_path
+
+    if not keras_path.exists():
+        print(f"❌ Keras model not found: {keras_path}")
+        return 1
+
+    if args.format == "onnx":
+        print(f"📦 Exporting {keras_path.name} to ONNX...")
+        export_keras_onnx(keras_path, output_path)
+        size_mb = output_path.stat().st_size / (1024 * 1024)
+        print(f"✓ ONNX model saved to: {output_path} ({size_mb:.2f} MB)")
+        return 0
+
+    if not args.calibration_dir.exists():
+        print(f"❌ Calibration folder not found: {args.calibration_dir}")
+        return 1
+
+    image_paths = collect_calibration_images(args.calibration_dir, args.samples)
+    if not image_paths:
+        print(f"❌ No calibration images in: {args.calibration_dir}")
+        return 1
+
+    print(f"📊 Calibrating {keras_path.name} on {len(image_paths)} images...")
+    if args.format == "onnx-int8":
+        fp32_path = output_path.with_name(f"{output_path.stem}_fp32.onnx")
+        export_keras_onnx(keras_path, fp32_path)
+        quantize_onnx_model(fp32_path, output_path, image_paths)
+        fp32_path.unlink()
+    else:
+        quantize_keras_model(keras_path, output_path, image_paths)
+
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"✓ INT8 model saved to: {output_path} ({size_mb:.2f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())